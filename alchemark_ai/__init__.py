@@ -6,28 +6,117 @@ with rich metadata and markdown element annotations.
 """
 
 # Use relative imports for internal package structure
-from .pdf2md.pdf2md import PDF2MarkDown
-from .formatter.formatter_md import FormatterMD
+from .pdf2md.pdf2md import PDF2MarkDown, PDFSource
+from .formatter.formatter_md import FormatterMD, TOKENIZER_MODEL, TOKEN_THREADS
+from .formatter.tokenizer import get_encoding
+from .cache.result_cache import ResultCache
+from .cache.page_memo import PageMemo
+from .incremental.incremental import IncrementalConverter
+from .images.image_store import ImageStore, DirectoryImageStore
+from .batch.batch import BatchConverter
+from .aio.aio import AsyncConverter
 from .models.FormattedResult import FormattedResult, FormattedMetadata, FormattedElements
-from typing import List
+from .models.BatchResult import BatchResult
+from .models.IncrementalResult import IncrementalResult
+from .models.Chunk import Chunk, ChunkSpan
+from .chunker.chunker import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_TOKENS
+from concurrent.futures import Executor
+from langdetect.detector_factory import init_factory
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+import asyncio
+import os
+import pymupdf
 
 __version__ = "0.1.10"
 
 # Define what gets imported with 'from alchemark_ai import *'
-__all__ = ['FormattedResult', 'pdf2md']
+__all__ = ['FormattedResult', 'BatchResult', 'IncrementalResult', 'Chunk', 'ChunkSpan', 'ResultCache', 'PageMemo', 'ImageStore', 'DirectoryImageStore', 'pdf2md', 'pdf2md_iter', 'pdf2md_chunks', 'pdf2md_batch', 'pdf2md_async', 'pdf2md_async_iter', 'pdf2md_incremental', 'warmup']
+
+def _conversion_options(
+    process_images: bool,
+    keep_images_inline: bool,
+    image_store: Optional[ImageStore] = None,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    stitch: bool = False,
+    strip_boilerplate: bool = False,
+    normalize_text: bool = False
+) -> Dict[str, Any]:
+    # Everything that changes the formatted output of an unchanged document.
+    return {
+        'process_images': process_images,
+        'keep_images_inline': keep_images_inline,
+        'image_store': image_store.identifier() if image_store is not None else None,
+        'tokenizer': TOKENIZER_MODEL,
+        'token_counter': token_counter,
+        'encodings': list(encodings or []),
+        'page_languages': page_languages,
+        'stitch': stitch,
+        'strip_boilerplate': strip_boilerplate,
+        'normalize_text': normalize_text,
+        'version': __version__,
+    }
+
+def warmup(encodings: Optional[List[str]] = None):
+    """
+    Preload the tokenizer, the language detection profiles and PyMuPDF's fonts.
+
+    Everything is otherwise loaded lazily on the first conversion. Call this in a
+    parent process before forking workers, or pass it as a pool initializer, so
+    that the first document each worker converts is as fast as later ones.
+
+    Args:
+        encodings: Extra encodings to preload, as passed to pdf2md(encodings=...)
+    """
+    for name in [TOKENIZER_MODEL, *(encodings or [])]:
+        get_encoding(name)
+    init_factory()
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), "AlcheMark")
+        page.get_text()
 
 def pdf2md(
-    pdf_file_path: str, 
+    pdf_file_path: PDFSource, 
     process_images: bool = False,
-    keep_images_inline: bool = False
+    keep_images_inline: bool = False,
+    workers: int = 1,
+    cache: Optional[ResultCache] = None,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_threads: int = TOKEN_THREADS,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    memo: Optional[PageMemo] = None,
+    format_workers: int = 1,
+    format_pool: str = "thread",
+    stitch: bool = False,
+    strip_boilerplate: bool = False,
+    normalize_text: bool = False
 ) -> List[FormattedResult]:
     """
     Convert a PDF file to markdown and format the results.
     
     Args:
-        pdf_file_path: Path to the PDF file
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
         process_images: Whether to extract and process images
         keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+        workers: Number of processes used to convert page shards of the document in parallel (1 = serial)
+        cache: Optional ResultCache; documents already converted with the same content and options are served from it
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_threads: Number of native threads used to count the tokens of all pages in one batch
+        token_counter: "exact" counts tokens with the BPE tokenizer; "approx" estimates them from character classes, several times faster, with a mean error of about 7% per paragraph and 5% per page (see README)
+        encodings: Extra tiktoken encodings or model names (e.g. ["o200k_base", "cl100k_base"]) whose exact counts are reported in tokens_by_encoding
+        page_languages: Detect the language of each page separately instead of reporting the document language on every page
+        memo: Optional PageMemo; token counts and languages of page texts already seen are served from it instead of being recomputed
+        format_workers: Number of workers formatting pages in parallel (1 = serial); pages keep their order
+        format_pool: "thread" or "process" pool for format_workers; processes also parallelize the pure Python scanning and language detection
+        stitch: Join paragraphs and tables split by a page break onto the page where they start (see FormattedResult.stitched)
+        strip_boilerplate: Remove running headers, footers and page numbers, found by their text and position on the page, before counting tokens (see FormattedResult.boilerplate_tokens)
+        normalize_text: Reflow hard-wrapped lines, join hyphenated words and collapse whitespace outside tables and code before counting tokens
     Returns:
         List of FormattedResult objects with the following structure:
         
@@ -46,9 +135,372 @@ def pdf2md(
                 links: List[Link]
             text: str
             tokens: int
+            image_tokens: int
+            tokens_by_encoding: Dict[str, int]
             language: str
+            stitched: List[StitchedText]
+            boilerplate_tokens: int
     """
-    pdf_converter = PDF2MarkDown(pdf_file_path, process_images)
+    pdf_converter = PDF2MarkDown(pdf_file_path, process_images, workers, lean, image_store, extract_words=strip_boilerplate)
+    if cache is not None:
+        cache_key = cache.key(pdf_converter.content_hash(), _conversion_options(process_images, keep_images_inline, image_store, token_counter, encodings, page_languages, stitch, strip_boilerplate, normalize_text))
+        cached_results = cache.get(cache_key)
+        if cached_results is not None:
+            # The same content may have been cached under another name.
+            for result in cached_results:
+                result.metadata.file_path = pdf_converter._source_name()
+            return cached_results
     markdown_content = pdf_converter.convert()
-    formatter = FormatterMD(markdown_content, keep_images_inline)
-    return formatter.format() 
\ No newline at end of file
+    formatter = FormatterMD(markdown_content, keep_images_inline, token_threads, token_counter, encodings, page_languages, memo, format_workers, format_pool, stitch, strip_boilerplate, normalize_text)
+    results = formatter.format()
+    if cache is not None:
+        cache.put(cache_key, results)
+    return results
+
+
+def pdf2md_iter(
+    pdf_file_path: PDFSource,
+    process_images: bool = False,
+    keep_images_inline: bool = False,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    memo: Optional[PageMemo] = None,
+    stitch: bool = False,
+    normalize_text: bool = False
+) -> Iterator[FormattedResult]:
+    """
+    Convert a PDF file to markdown one page at a time.
+    
+    Same options and output as pdf2md(), but each page is extracted, formatted and
+    yielded as soon as it is ready, so the first page is available immediately and
+    memory usage does not grow with the number of pages. Without look-ahead, the
+    document language is detected from the leading pages only, and may differ
+    from pdf2md() when those are short or in another language.
+    
+    Args:
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_counter: "exact" or "approx" token counting (see pdf2md)
+        encodings: Extra encodings reported in tokens_by_encoding (see pdf2md)
+        page_languages: Detect the language of each page separately (see pdf2md)
+        memo: Optional PageMemo for token counts and languages (see pdf2md)
+        stitch: Join paragraphs and tables split by a page break (see pdf2md); each page is then yielded once the next one is converted
+        normalize_text: Reflow lines and collapse whitespace before counting tokens (see pdf2md)
+    Yields:
+        One FormattedResult per page, in page order.
+    """
+    pdf_converter = PDF2MarkDown(pdf_file_path, process_images, lean=lean, image_store=image_store)
+    formatter = FormatterMD(pdf_converter.convert_iter(), keep_images_inline, token_counter=token_counter, encodings=encodings, page_languages=page_languages, memo=memo, stitch=stitch, normalize_text=normalize_text)
+    yield from formatter.format_iter()
+
+
+def pdf2md_chunks(
+    pdf_file_path: PDFSource,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+    sections: bool = False,
+    process_images: bool = False,
+    keep_images_inline: bool = False,
+    workers: int = 1,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_threads: int = TOKEN_THREADS,
+    format_workers: int = 1,
+    format_pool: str = "thread",
+    stitch: bool = False,
+    strip_boilerplate: bool = False,
+    normalize_text: bool = False
+) -> List[Chunk]:
+    """
+    Convert a PDF file to markdown and split it into retrieval chunks.
+    
+    Chunks are cut from the token ids computed while formatting, so the text is
+    tokenized once. They hold at most max_tokens tokens, end at paragraph,
+    heading or page boundaries where possible, and may span pages.
+    
+    Args:
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
+        max_tokens: Maximum number of tokens per chunk
+        overlap: Maximum number of tokens a chunk repeats from the end of the previous one
+        sections: Group pages into sections following the PDF outline (toc_items); a section is split only when it exceeds max_tokens, and its chunks carry the heading breadcrumb
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether images are inline in FormattedResult.text; chunks always hold [IMAGE](hash) references instead of payloads, and their spans then refer to the page texts with those references, which are not returned (see FormatterMD.masked_texts)
+        workers: Number of processes used to convert page shards of the document in parallel (1 = serial)
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_threads: Number of native threads used to tokenize all pages in one batch
+        format_workers: Number of workers formatting pages in parallel (see pdf2md)
+        format_pool: "thread" or "process" pool for format_workers (see pdf2md)
+        stitch: Join paragraphs and tables split by a page break before chunking; chunks holding stitched text list both pages
+        strip_boilerplate: Remove running headers, footers and page numbers before chunking (see pdf2md)
+        normalize_text: Reflow lines and collapse whitespace before chunking (see pdf2md)
+    Returns:
+        List of Chunk objects:
+        
+        Chunk:
+            text: str
+            tokens: int
+            pages: List[int]
+            spans: List[ChunkSpan]
+                page: int
+                start: int
+                end: int
+            headings: List[str]
+    """
+    pdf_converter = PDF2MarkDown(pdf_file_path, process_images, workers, lean, image_store, extract_words=strip_boilerplate)
+    markdown_content = pdf_converter.convert()
+    formatter = FormatterMD(markdown_content, keep_images_inline, token_threads, workers=format_workers, pool=format_pool, stitch=stitch, strip_boilerplate=strip_boilerplate, normalize_text=normalize_text)
+    return formatter.format_chunks(max_tokens, overlap, sections)
+
+
+def pdf2md_batch(
+    pdf_file_paths: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+    process_images: bool = False,
+    keep_images_inline: bool = False,
+    max_pending: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_threads: int = TOKEN_THREADS,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    memo: Optional[PageMemo] = None,
+    stitch: bool = False,
+    strip_boilerplate: bool = False,
+    normalize_text: bool = False
+) -> Iterator[BatchResult]:
+    """
+    Convert many PDF files in a pool of worker processes.
+    
+    Results are yielded as soon as each document finishes, so they arrive in
+    completion order rather than input order. A document that fails does not
+    abort the batch: its BatchResult carries the error message instead of pages.
+    At most max_pending chunks are in flight at once, so memory stays bounded
+    even for very long (or lazily generated) lists of paths.
+    
+    Args:
+        pdf_file_paths: Paths to the PDF files (any iterable, consumed lazily)
+        workers: Number of worker processes (defaults to the number of CPUs)
+        chunksize: Number of documents sent to a worker per task
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+        max_pending: Maximum number of chunks in flight (defaults to 2 x workers)
+        cache: Optional ResultCache shared by all workers
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_threads: Number of native threads each worker uses to count tokens
+        token_counter: "exact" or "approx" token counting (see pdf2md)
+        encodings: Extra encodings reported in tokens_by_encoding (see pdf2md)
+        page_languages: Detect the language of each page separately (see pdf2md)
+        memo: Optional PageMemo; each worker keeps its own memory tier and shares the memo's directory, if any
+        stitch: Join paragraphs and tables split by a page break (see pdf2md)
+        strip_boilerplate: Remove running headers, footers and page numbers (see pdf2md)
+        normalize_text: Reflow lines and collapse whitespace before counting tokens (see pdf2md)
+    Yields:
+        BatchResult:
+            file_path: str
+            results: List[FormattedResult]
+            error: Optional[str]
+    """
+    batch_converter = BatchConverter(
+        pdf_file_paths,
+        workers=workers,
+        chunksize=chunksize,
+        max_pending=max_pending,
+        process_images=process_images,
+        keep_images_inline=keep_images_inline,
+        cache=cache,
+        lean=lean,
+        image_store=image_store,
+        token_threads=token_threads,
+        token_counter=token_counter,
+        encodings=encodings,
+        page_languages=page_languages,
+        memo=memo,
+        stitch=stitch,
+        strip_boilerplate=strip_boilerplate,
+        normalize_text=normalize_text
+    )
+    yield from batch_converter.convert_iter()
+
+
+async def pdf2md_async(
+    pdf_file_path: PDFSource,
+    process_images: bool = False,
+    keep_images_inline: bool = False,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    workers: int = 1,
+    cache: Optional[ResultCache] = None,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_threads: int = TOKEN_THREADS,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    memo: Optional[PageMemo] = None,
+    format_workers: int = 1,
+    format_pool: str = "thread",
+    stitch: bool = False,
+    strip_boilerplate: bool = False,
+    normalize_text: bool = False
+) -> List[FormattedResult]:
+    """
+    Asynchronous version of pdf2md() that does not block the event loop.
+    
+    pdf2md() runs in the given executor (the event loop's default thread pool
+    when None), with the same options. Share one asyncio.Semaphore between calls
+    to cap the number of documents in flight; a cancelled call keeps its slot
+    until the conversion it started has finished.
+    
+    Args:
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+        executor: concurrent.futures executor (thread or process pool) running the blocking work
+        semaphore: Semaphore limiting how many documents are converted at once
+        workers: Number of worker processes used to extract pages (see pdf2md)
+        cache: Optional ResultCache (see pdf2md)
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_threads: Number of native threads used to count tokens
+        token_counter: "exact" or "approx" token counting (see pdf2md)
+        encodings: Extra encodings reported in tokens_by_encoding (see pdf2md)
+        page_languages: Detect the language of each page separately (see pdf2md)
+        memo: Optional PageMemo for token counts and languages (see pdf2md)
+        format_workers: Number of workers formatting pages in parallel (see pdf2md)
+        format_pool: "thread" or "process" pool for format_workers (see pdf2md)
+        stitch: Join paragraphs and tables split by a page break (see pdf2md)
+        strip_boilerplate: Remove running headers, footers and page numbers (see pdf2md)
+        normalize_text: Reflow lines and collapse whitespace before counting tokens (see pdf2md)
+    Returns:
+        List of FormattedResult objects, as returned by pdf2md()
+    """
+    async_converter = AsyncConverter(
+        pdf_file_path,
+        executor,
+        semaphore,
+        process_images=process_images,
+        keep_images_inline=keep_images_inline,
+        workers=workers,
+        cache=cache,
+        lean=lean,
+        image_store=image_store,
+        token_threads=token_threads,
+        token_counter=token_counter,
+        encodings=encodings,
+        page_languages=page_languages,
+        memo=memo,
+        format_workers=format_workers,
+        format_pool=format_pool,
+        stitch=stitch,
+        strip_boilerplate=strip_boilerplate,
+        normalize_text=normalize_text
+    )
+    return await async_converter.convert()
+
+
+async def pdf2md_async_iter(
+    pdf_file_path: PDFSource,
+    process_images: bool = False,
+    keep_images_inline: bool = False,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    lean: bool = False,
+    image_store: Optional[ImageStore] = None,
+    token_counter: str = "exact",
+    encodings: Optional[List[str]] = None,
+    page_languages: bool = False,
+    memo: Optional[PageMemo] = None,
+    stitch: bool = False,
+    normalize_text: bool = False
+) -> AsyncIterator[FormattedResult]:
+    """
+    Asynchronous version of pdf2md_iter() yielding one FormattedResult per page.
+    
+    Each page of pdf2md_iter(), with the same options, is converted in the given
+    executor, which must be thread based (the event loop's default thread pool
+    when None). The semaphore slot is held until the iteration finishes or is
+    cancelled; cancelling stops the conversion after the page currently being
+    processed, and the slot is released once that page is done.
+    
+    Args:
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+        executor: Thread pool executor running the blocking work
+        semaphore: Semaphore limiting how many documents are converted at once
+        lean: Skip the per-page words and graphics payloads, which the formatted output never uses
+        image_store: Write extracted images once to this ImageStore (e.g. DirectoryImageStore) instead of embedding them as base64; implies process_images
+        token_counter: "exact" or "approx" token counting (see pdf2md)
+        encodings: Extra encodings reported in tokens_by_encoding (see pdf2md)
+        page_languages: Detect the language of each page separately (see pdf2md)
+        memo: Optional PageMemo for token counts and languages (see pdf2md)
+        stitch: Join paragraphs and tables split by a page break (see pdf2md_iter)
+        normalize_text: Reflow lines and collapse whitespace before counting tokens (see pdf2md)
+    Yields:
+        One FormattedResult per page, in page order.
+    """
+    async_converter = AsyncConverter(
+        pdf_file_path,
+        executor,
+        semaphore,
+        process_images=process_images,
+        keep_images_inline=keep_images_inline,
+        lean=lean,
+        image_store=image_store,
+        token_counter=token_counter,
+        encodings=encodings,
+        page_languages=page_languages,
+        memo=memo,
+        stitch=stitch,
+        normalize_text=normalize_text
+    )
+    async for page in async_converter.convert_iter():
+        yield page
+
+
+def pdf2md_incremental(
+    pdf_file_path: PDFSource,
+    manifest_path: Union[str, os.PathLike],
+    process_images: bool = False,
+    keep_images_inline: bool = False
+) -> IncrementalResult:
+    """
+    Re-convert only the pages of a PDF that changed since the previous run.
+    
+    Every page is fingerprinted from its content stream and the resources it
+    uses (fonts, images, form XObjects, links). Pages whose fingerprint is found
+    in the manifest written by the previous run reuse the stored FormattedResult,
+    even if they moved; only new or changed pages are converted. The document
+    language is detected from the language samples the manifest keeps for every
+    page. The manifest is then rewritten for the next run.
+    
+    Args:
+        pdf_file_path: Path to the PDF file, or the PDF itself as bytes, bytearray, memoryview or a binary file object
+        manifest_path: JSON file holding the page fingerprints and results of the previous run
+        process_images: Whether to extract and process images
+        keep_images_inline: Whether to keep images inline in the markdown text or to use a reference to the image (Image hash)
+    Returns:
+        IncrementalResult:
+            results: List[FormattedResult]  # every page, in page order
+            changed_pages: List[int]         # pages that were (re)converted
+            reused_pages: List[int]          # pages served from the manifest
+    """
+    incremental_converter = IncrementalConverter(
+        pdf_file_path,
+        manifest_path,
+        process_images,
+        keep_images_inline,
+        options=_conversion_options(process_images, keep_images_inline)
+    )
+    return incremental_converter.convert()
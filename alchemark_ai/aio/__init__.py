@@ -0,0 +1,3 @@
+from .aio import AsyncConverter
+
+__all__ = ['AsyncConverter']
@@ -0,0 +1,101 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from ..models import FormattedResult
+from ..pdf2md.pdf2md import PDFSource
+
+_END_OF_PAGES = object()
+
+
+# Module-level steps so that they can also be shipped to a ProcessPoolExecutor.
+def _convert(pdf_file_path: PDFSource, options: Dict[str, Any]) -> List[FormattedResult]:
+    # Imported here so that every option of the public entry point is
+    # supported, without importing the package while it initialises.
+    from .. import pdf2md
+
+    return pdf2md(pdf_file_path, **options)
+
+
+def _convert_iter(pdf_file_path: PDFSource, options: Dict[str, Any]) -> Iterator[FormattedResult]:
+    from .. import pdf2md_iter
+
+    return pdf2md_iter(pdf_file_path, **options)
+
+
+def _finish_job(job: asyncio.Future, semaphore: Optional[asyncio.Semaphore]):
+    # Runs once a conversion whose caller was cancelled has finished.
+    if not job.cancelled():
+        job.exception()
+    if semaphore is not None:
+        semaphore.release()
+
+
+def _close_pages(pages: Iterator[FormattedResult], step: asyncio.Future, semaphore: Optional[asyncio.Semaphore]):
+    # Runs once the page being converted when the consumer stopped is done.
+    if not step.cancelled():
+        step.exception()
+    pages.close()
+    if semaphore is not None:
+        semaphore.release()
+
+
+class AsyncConverter:
+    def __init__(
+        self,
+        pdf_file_path: PDFSource,
+        executor: Optional[Executor] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        **options
+    ):
+        self.pdf_file_path = pdf_file_path
+        self.executor = executor
+        self.semaphore = semaphore
+        self.options = options
+
+    async def _acquire(self):
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+
+    def _release(self):
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    async def convert(self) -> List[FormattedResult]:
+        loop = asyncio.get_running_loop()
+        await self._acquire()
+        job = None
+        try:
+            job = loop.run_in_executor(self.executor, functools.partial(_convert, self.pdf_file_path, self.options))
+            # Shielded so that a cancelled caller does not give up the
+            # semaphore slot while the conversion is still running.
+            return await asyncio.shield(job)
+        finally:
+            if job is not None and not job.done():
+                job.add_done_callback(functools.partial(_finish_job, semaphore=self.semaphore))
+            else:
+                self._release()
+
+    async def convert_iter(self) -> AsyncIterator[FormattedResult]:
+        # The page generator lives in this process, so the executor must be
+        # thread based (or None for the event loop's default executor).
+        loop = asyncio.get_running_loop()
+        await self._acquire()
+        pages = _convert_iter(self.pdf_file_path, self.options)
+        step = None
+        try:
+            while True:
+                step = loop.run_in_executor(self.executor, next, pages, _END_OF_PAGES)
+                # Shielded so that a cancelled consumer does not leave the
+                # generator running in a worker thread while it is closed, nor
+                # give up the semaphore slot while that page is converted.
+                page = await asyncio.shield(step)
+                if page is _END_OF_PAGES:
+                    break
+                yield page
+        finally:
+            if step is not None and not step.done():
+                step.add_done_callback(functools.partial(_close_pages, pages, semaphore=self.semaphore))
+            else:
+                pages.close()
+                self._release()
@@ -0,0 +1,3 @@
+from .batch import BatchConverter
+
+__all__ = ['BatchConverter']
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from ..configs.logger import logging
+from ..models import BatchResult
+
+
+def _convert_documents(file_paths: List[str], options: Dict[str, Any]) -> List[BatchResult]:
+    # Imported here so that worker processes resolve the public entry point
+    # (and every option it supports) after the package is fully initialised.
+    from .. import pdf2md
+
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(BatchResult(file_path=str(file_path), results=pdf2md(file_path, **options)))
+        except Exception as e:
+            results.append(BatchResult(file_path=str(file_path), error=str(e)))
+    return results
+
+
+def _warmup_worker():
+    from .. import warmup
+
+    warmup()
+
+
+class BatchConverter:
+    def __init__(
+        self,
+        file_paths: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+        max_pending: Optional[int] = None,
+        **options
+    ):
+        self.file_paths = file_paths
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.max_pending = max_pending or self.workers * 2
+        self.options = options
+
+    def _check_params(self):
+        if self.workers < 1:
+            raise ValueError("[BATCH] workers must be a positive integer.")
+        if self.chunksize < 1:
+            raise ValueError("[BATCH] chunksize must be a positive integer.")
+        if self.max_pending < 1:
+            raise ValueError("[BATCH] max_pending must be a positive integer.")
+
+    def _chunks(self) -> Iterator[List[str]]:
+        chunk = []
+        for file_path in self.file_paths:
+            chunk.append(file_path)
+            if len(chunk) == self.chunksize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def convert_iter(self) -> Iterator[BatchResult]:
+        self._check_params()
+        chunks = self._chunks()
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warmup_worker)
+        pending = {}
+
+        def submit_next() -> bool:
+            nonlocal executor
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            try:
+                future = executor.submit(_convert_documents, chunk, self.options)
+            except BrokenProcessPool:
+                logging.warning("[BATCH] Worker pool is broken, starting a new one.")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warmup_worker)
+                future = executor.submit(_convert_documents, chunk, self.options)
+            pending[future] = chunk
+            return True
+
+        try:
+            # Only max_pending chunks are ever in flight: a new chunk is submitted
+            # after a finished one has been handed to the caller, so a slow
+            # consumer throttles the pool instead of piling up results.
+            while len(pending) < self.max_pending and submit_next():
+                pass
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logging.error(f"[BATCH] Worker failed while converting {chunk}: {e}")
+                        results = [BatchResult(file_path=str(file_path), error=f"[BATCH] Worker failed: {e}") for file_path in chunk]
+                    yield from results
+                    submit_next()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
\ No newline at end of file
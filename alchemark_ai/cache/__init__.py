@@ -0,0 +1,4 @@
+from .result_cache import ResultCache
+from .page_memo import PageMemo, MemoStats
+
+__all__ = ['ResultCache', 'PageMemo', 'MemoStats']
\ No newline at end of file
@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+from ..configs.logger import logging
+from ..utils.files import write_atomic
+
+# Writes keep a running size estimate, and the directory is only scanned when
+# it crosses max_size, or every EVICT_SCAN_INTERVAL writes to pick up entries
+# written by other processes sharing the directory.
+EVICT_SCAN_INTERVAL = 256
+# Eviction frees a little more than needed, so the next writes do not scan again.
+EVICT_LOW_WATERMARK = 0.9
+
+
+class DirectoryStore:
+    """Size-bounded directory of files named by hex keys, shared by processes.
+
+    Entries live in cache_dir/<first two key characters>/<key>.json and are
+    written atomically. Reads refresh an entry's modification time, and the
+    least recently used entries are removed once the directory outgrows
+    max_size. Each entry counts for at least min_entry_size bytes, so a store
+    of tiny files is bounded by their number as well.
+    """
+
+    log_prefix = "[CACHE]"
+    min_entry_size = 0
+
+    def __init__(self, cache_dir: Union[str, os.PathLike], max_size: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size_estimate: Optional[int] = None
+        self._writes_since_scan = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entry_size(self, size: int) -> int:
+        return max(size, self.min_entry_size)
+
+    def _touch(self, entry_path: Path):
+        try:
+            # Reads refresh the modification time, which drives LRU eviction.
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+    def _write(self, key: str, data: bytes):
+        entry_path = self._entry_path(key)
+        try:
+            replaced_size = self._entry_size(entry_path.stat().st_size)
+        except OSError:
+            replaced_size = 0
+        try:
+            write_atomic(entry_path, data)
+        except OSError as e:
+            logging.warning(f"{self.log_prefix} Could not write entry {entry_path}: {e}")
+            return
+        self._writes_since_scan += 1
+        if self._size_estimate is None or self._writes_since_scan >= EVICT_SCAN_INTERVAL:
+            self._evict()
+            return
+        self._size_estimate += self._entry_size(len(data)) - replaced_size
+        if self._size_estimate > self.max_size:
+            self._evict()
+
+    def _remove(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"{self.log_prefix} Could not remove entry {path}: {e}")
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    entries.append(entry)
+        return entries
+
+    def _evict(self):
+        # Scans the directory, then removes the least recently used entries
+        # until the store is back under the low watermark.
+        sized_entries = []
+        total_size = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Removed by another worker sharing the directory.
+                continue
+            size = self._entry_size(stat.st_size)
+            sized_entries.append((stat.st_mtime, size, entry.path))
+            total_size += size
+        if total_size > self.max_size:
+            target_size = int(self.max_size * EVICT_LOW_WATERMARK)
+            sized_entries.sort()
+            for _, size, path in sized_entries:
+                if total_size <= target_size:
+                    break
+                self._remove(Path(path))
+                total_size -= size
+        self._size_estimate = total_size
+        self._writes_since_scan = 0
+
+    def size(self) -> int:
+        total_size = 0
+        for entry in self._entries():
+            try:
+                total_size += self._entry_size(entry.stat().st_size)
+            except FileNotFoundError:
+                continue
+        return total_size
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(Path(entry.path))
+        self._size_estimate = 0
+        self._writes_since_scan = 0
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+from ..configs.logger import logging
+from .directory_store import DirectoryStore
+
+DEFAULT_MAX_ENTRIES = 65536
+DEFAULT_MAX_DISK_SIZE = 256 * 1024 * 1024
+# Memo entries are a few bytes each, so each one is counted as the filesystem
+# block it occupies.
+MEMO_ENTRY_SIZE = 4096
+# Memoized values may be None (e.g. no language detected), so misses use a sentinel.
+_MISSING = object()
+
+
+class MemoStats(NamedTuple):
+    hits: int
+    disk_hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class _MemoStore(DirectoryStore):
+    log_prefix = "[MEMO]"
+    min_entry_size = MEMO_ENTRY_SIZE
+
+
+class PageMemo:
+    """Bounded LRU memo of values computed from page text, keyed by a hash of the text.
+
+    Values are stored per namespace (e.g. "tokens:gpt-4o", "language"), so the
+    same text can carry a token count for each encoding and a language. With
+    cache_dir, entries missing from memory are looked up in, and written to, a
+    directory that several processes can share, bounded to max_disk_size bytes
+    (least recently used first out, each entry counting as one 4 KiB block).
+
+    A memo sent to another process (e.g. a pdf2md_batch worker) arrives with an
+    empty memory tier and its own stats, and shares only the directory.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[Union[str, os.PathLike]] = None, max_disk_size: int = DEFAULT_MAX_DISK_SIZE):
+        if max_entries < 1:
+            raise ValueError("[MEMO] max_entries must be a positive integer.")
+        self.max_entries = max_entries
+        self.max_disk_size = max_disk_size
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._store = _MemoStore(self.cache_dir, max_disk_size) if self.cache_dir is not None else None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'max_entries': self.max_entries, 'cache_dir': self.cache_dir, 'max_disk_size': self.max_disk_size}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state['max_entries'], state['cache_dir'], state['max_disk_size'])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        digest = hashlib.blake2b(namespace.encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._store._entry_path(key)
+
+    def _read(self, key: str) -> Any:
+        entry_path = self._entry_path(key)
+        try:
+            value = json.loads(entry_path.read_bytes())
+        except FileNotFoundError:
+            return _MISSING
+        except (OSError, ValueError) as e:
+            logging.warning(f"[MEMO] Could not read memo entry {entry_path}: {e}")
+            return _MISSING
+        self._store._touch(entry_path)
+        return value
+
+    def _write(self, key: str, value: Any):
+        self._store._write(key, json.dumps(value).encode())
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, namespace: str, text: str) -> Any:
+        key = self.key(namespace, text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+        value = self._read(key) if self.cache_dir is not None else _MISSING
+        with self._lock:
+            if value is _MISSING:
+                self._misses += 1
+            else:
+                self._disk_hits += 1
+        if value is not _MISSING:
+            self._remember(key, value)
+        return value
+
+    def get(self, namespace: str, text: str, default: Any = None) -> Any:
+        value = self._lookup(namespace, text)
+        return default if value is _MISSING else value
+
+    def put(self, namespace: str, text: str, value: Any):
+        key = self.key(namespace, text)
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            self._write(key, value)
+
+    def get_many(self, namespace: str, texts: List[str], compute: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """Return one value per text, calling compute once on the distinct texts not memoized yet."""
+        values = [self._lookup(namespace, text) for text in texts]
+        missing = list(dict.fromkeys(text for text, value in zip(texts, values) if value is _MISSING))
+        if not missing:
+            return values
+        computed = dict(zip(missing, compute(missing)))
+        for text, value in computed.items():
+            self.put(namespace, text, value)
+        return [computed[text] if value is _MISSING else value for text, value in zip(texts, values)]
+
+    def stats(self) -> MemoStats:
+        with self._lock:
+            return MemoStats(self._hits, self._disk_hits, self._misses)
+
+    def clear(self):
+        """Drop every entry from memory and from the directory, and reset the stats."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._disk_hits = self._misses = 0
+        if self._store is not None:
+            self._store.clear()
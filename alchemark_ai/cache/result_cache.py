@@ -0,0 +1,43 @@
+import hashlib
+import json
+import os
+from pydantic import TypeAdapter
+from typing import Any, Dict, List, Optional, Union
+from ..configs.logger import logging
+from ..models import FormattedResult
+from .directory_store import DirectoryStore
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+_results_adapter = TypeAdapter(List[FormattedResult])
+
+
+class ResultCache(DirectoryStore):
+    def __init__(self, cache_dir: Union[str, os.PathLike], max_size: int = DEFAULT_MAX_SIZE):
+        super().__init__(cache_dir, max_size)
+
+    @staticmethod
+    def key(content_hash: str, options: Dict[str, Any]) -> str:
+        payload = json.dumps({"content": content_hash, **options}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[FormattedResult]]:
+        entry_path = self._entry_path(key)
+        try:
+            data = entry_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(f"[CACHE] Could not read cache entry {entry_path}: {e}")
+            return None
+        try:
+            results = _results_adapter.validate_json(data)
+        except Exception as e:
+            logging.warning(f"[CACHE] Discarding corrupt cache entry {entry_path}: {e}")
+            self._remove(entry_path)
+            return None
+        self._touch(entry_path)
+        return results
+
+    def put(self, key: str, results: List[FormattedResult]):
+        self._write(key, _results_adapter.dump_json(results))
@@ -0,0 +1,3 @@
+from .chunker import chunk_pages, chunk_sections
+
+__all__ = ['chunk_pages', 'chunk_sections']
\ No newline at end of file
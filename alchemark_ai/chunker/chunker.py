@@ -0,0 +1,215 @@
+import bisect
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+from ..models import Chunk, ChunkSpan, StitchedText
+
+DEFAULT_CHUNK_TOKENS = 512
+DEFAULT_CHUNK_OVERLAP = 64
+# Chunk text joins its pages with a blank line, which the page token ids do not
+# hold; re-encoding the seam takes at most this many extra tokens.
+JOINER_TOKENS = 2
+PAGE_JOINER = "\n\n"
+
+# A block starts after a run of blank lines (a paragraph) or at a heading line.
+BLOCK_BOUNDARY_PATTERN = re.compile(r'\n(?:[^\S\n]*\n)+|\n(?=[^\S\n]*#{1,6}[^\S\n])')
+HEADING_BOUNDARY_PATTERN = re.compile(r'^(?=[^\S\n]*#{1,6}[^\S\n])', re.MULTILINE)
+LINE_BOUNDARY_PATTERN = re.compile(r'\n')
+
+
+class ChunkSource(NamedTuple):
+    page: int
+    text: str
+    token_ids: Sequence[int]
+    toc_items: Sequence[Sequence[Union[int, str]]] = ()
+    stitched: Sequence[StitchedText] = ()
+
+
+def check_chunk_options(max_tokens: int, overlap: int):
+    if max_tokens < 1:
+        raise ValueError("[CHUNKER] max_tokens must be a positive integer.")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("[CHUNKER] overlap must be at least 0 and smaller than max_tokens.")
+
+
+def _token_offsets(encoding, source: ChunkSource) -> List[int]:
+    # Character offset of every token in the page text, followed by the text length.
+    _, offsets = encoding.decode_with_offsets(source.token_ids)
+    offsets.append(len(source.text))
+    return offsets
+
+
+def _span(source: ChunkSource, offsets: List[int], start: int, end: int) -> ChunkSpan:
+    # Character span of tokens [start, end), without surrounding whitespace.
+    text = source.text
+    char_start, char_end = offsets[start], offsets[end]
+    while char_start < char_end and text[char_start].isspace():
+        char_start += 1
+    while char_end > char_start and text[char_end - 1].isspace():
+        char_end -= 1
+    return ChunkSpan(page=source.page, start=char_start, end=char_end)
+
+
+def _token_boundaries(pattern: re.Pattern, text: str, offsets: List[int], base: int, page_start: bool = True) -> List[int]:
+    # Token indices (offset by base) of the tokens starting where pattern matches
+    # end, and of the page start. Match ends and token offsets both increase, so
+    # one walk maps them.
+    token_count = len(offsets) - 1
+    boundaries = [base] if base and page_start else []
+    token = 0
+    for match in pattern.finditer(text):
+        while token < token_count and offsets[token] < match.end():
+            token += 1
+        if token < token_count and base + token and boundaries[-1:] != [base + token]:
+            boundaries.append(base + token)
+    return boundaries
+
+
+def _last_boundary(boundaries: List[int], start: int, end: int) -> Optional[int]:
+    # Largest boundary in (start, end].
+    i = bisect.bisect_right(boundaries, end) - 1
+    return boundaries[i] if i >= 0 and boundaries[i] > start else None
+
+
+def _first_boundary(boundaries: List[int], start: int, end: int) -> Optional[int]:
+    # Smallest boundary in [start, end).
+    i = bisect.bisect_left(boundaries, start)
+    return boundaries[i] if i < len(boundaries) and boundaries[i] < end else None
+
+
+class _TokenStream:
+    # The pages of a document as one token stream, with the token indices where
+    # headings, blocks and lines start.
+
+    def __init__(self, sources: List[ChunkSource], encoding):
+        self.sources = sources
+        self.bases, self.offsets, self.headings, self.blocks, self.lines = [], [], [], [], []
+        self.total = 0
+        for source in sources:
+            page_offsets = _token_offsets(encoding, source)
+            self.bases.append(self.total)
+            self.offsets.append(page_offsets)
+            if source.token_ids:
+                self.headings.extend(_token_boundaries(HEADING_BOUNDARY_PATTERN, source.text, page_offsets, self.total, page_start=False))
+                self.blocks.extend(_token_boundaries(BLOCK_BOUNDARY_PATTERN, source.text, page_offsets, self.total))
+                self.lines.extend(_token_boundaries(LINE_BOUNDARY_PATTERN, source.text, page_offsets, self.total))
+            self.total += len(source.token_ids)
+
+    def token_at(self, index: int, char: int) -> int:
+        # Stream index of the first token of page index starting at or after char.
+        return self.bases[index] + bisect.bisect_left(self.offsets[index], char, hi=len(self.sources[index].token_ids))
+
+    def seams(self, start: int, end: int) -> int:
+        # Number of page starts inside (start, end).
+        return max(0, bisect.bisect_left(self.bases, end) - bisect.bisect_right(self.bases, start))
+
+    def split(self, start: int, stop: int, max_tokens: int, overlap: int, breadcrumb: List[str]) -> List[Chunk]:
+        chunks = []
+        while start < stop:
+            # Room is left for the joiner at every page seam the chunk may cross.
+            budget = max(1, max_tokens - JOINER_TOKENS * self.seams(start, start + max_tokens))
+            end = start + budget
+            if end >= stop:
+                end = stop
+            else:
+                half = start + budget // 2
+                end = (
+                    _last_boundary(self.headings, half - 1, end)
+                    or _last_boundary(self.blocks, half - 1, end)
+                    or _last_boundary(self.lines, start, end)
+                    or end
+                )
+            chunks.append(self.chunk(start, end, breadcrumb))
+            if end >= stop:
+                break
+            if end - overlap <= start:
+                # A chunk no longer than the overlap would only be repeated.
+                start = end
+            else:
+                start = (
+                    _first_boundary(self.blocks, end - overlap, end)
+                    or _first_boundary(self.lines, end - overlap, end)
+                    or end - overlap
+                )
+        return chunks
+
+    def chunk(self, start: int, end: int, breadcrumb: List[str]) -> Chunk:
+        spans, texts, pages = [], [], []
+        index = bisect.bisect_right(self.bases, start) - 1
+        while index < len(self.sources) and self.bases[index] < end:
+            source = self.sources[index]
+            local_start = max(start - self.bases[index], 0)
+            local_end = min(end - self.bases[index], len(source.token_ids))
+            if local_start < local_end:
+                span = _span(source, self.offsets[index], local_start, local_end)
+                if span.start < span.end:
+                    spans.append(span)
+                    texts.append(source.text[span.start:span.end])
+                    pages.append(span.page)
+                    # Text stitched onto this page keeps its own page number.
+                    pages.extend(
+                        stitched.page for stitched in source.stitched
+                        if stitched.start < span.end and span.start < stitched.end
+                    )
+            index += 1
+        return Chunk(
+            text=PAGE_JOINER.join(texts),
+            tokens=end - start,
+            pages=list(dict.fromkeys(pages)),
+            spans=spans,
+            headings=list(breadcrumb)
+        )
+
+
+def chunk_pages(sources: List[ChunkSource], encoding, max_tokens: int = DEFAULT_CHUNK_TOKENS, overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[Chunk]:
+    """Split pages into chunks of at most max_tokens tokens, reusing their token ids.
+
+    The pages form one token stream. A chunk ends before the last heading in the
+    second half of its budget, or else at the last paragraph or page start that
+    fits. If that would leave it less than half full, it ends at the last line
+    start instead, and only a line longer than the budget is cut mid-text.
+    Consecutive chunks share up to overlap tokens, starting at the first block,
+    or else line, start inside the overlap. Chunk text joins its pages with a
+    blank line, and JOINER_TOKENS per page seam are left free for it, so the
+    re-encoded text fits max_tokens too.
+    """
+    check_chunk_options(max_tokens, overlap)
+    stream = _TokenStream(sources, encoding)
+    return stream.split(0, stream.total, max_tokens, overlap, [])
+
+
+def _section_starts(stream: _TokenStream) -> List[Tuple[int, List[str]]]:
+    # (stream index, heading breadcrumb) for every outline entry, in page order.
+    starts = []
+    breadcrumb: List[str] = []
+    for index, source in enumerate(stream.sources):
+        position = 0
+        for entry in source.toc_items:
+            if len(entry) < 2 or not isinstance(entry[0], int):
+                continue
+            level, title = max(entry[0], 1), str(entry[1]).strip()
+            breadcrumb = breadcrumb[:level - 1] + [title]
+            # The section starts at the line holding its title, if the page has it.
+            match = re.compile(re.escape(title), re.IGNORECASE).search(source.text, position) if title else None
+            if match:
+                position = max(position, source.text.rfind("\n", 0, match.start()) + 1)
+            starts.append((stream.token_at(index, position), breadcrumb))
+    return starts
+
+
+def chunk_sections(sources: List[ChunkSource], encoding, max_tokens: int = DEFAULT_CHUNK_TOKENS, overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[Chunk]:
+    """Split pages into outline sections, reusing their token ids.
+
+    Sections start at the PDF outline entries (the toc_items of each page), at
+    the line holding the entry title when the page text has it, or else where
+    the previous entry on the page started. Each section becomes one chunk
+    carrying its heading breadcrumb, and a section longer than max_tokens is
+    split as chunk_pages() would split it. Without an outline, this is
+    chunk_pages().
+    """
+    check_chunk_options(max_tokens, overlap)
+    stream = _TokenStream(sources, encoding)
+    starts = [(0, [])] + _section_starts(stream) + [(stream.total, [])]
+    chunks = []
+    for (start, breadcrumb), (stop, _) in zip(starts, starts[1:]):
+        chunks.extend(stream.split(start, stop, max_tokens, overlap, breadcrumb))
+    return chunks
@@ -0,0 +1,127 @@
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from ..models import PDFResult
+from .stitcher import IMAGE_MARKUP
+import math
+import re
+
+# A line is boilerplate when it recurs on at least this share of the pages,
+# and on no fewer than BOILERPLATE_MIN_PAGES of them.
+BOILERPLATE_PAGE_RATIO = 0.5
+BOILERPLATE_MIN_PAGES = 3
+# Only the first and last few text lines of a page can be headers or footers.
+BOILERPLATE_EDGE_LINES = 3
+# Word lines within this many points of each other sit at the same position.
+BOILERPLATE_Y_TOLERANCE = 4.0
+# Digits are ignored only in short lines, like page numbers and dates; longer
+# numbered lines are more likely templated body text.
+BOILERPLATE_NUMBERED_WORDS = 8
+
+MARKUP_PATTERN = re.compile(r'[*_`#>]+')
+HEADING_PATTERN = re.compile(r'#{1,6}\s')
+DIGITS_PATTERN = re.compile(r'\d+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+LINE_PATTERN = re.compile(r'[^\n]*\n?')
+
+
+def normalize_line(text: str) -> str:
+    # Page numbers and dates change from page to page; emphasis and heading
+    # markup may not be applied the same way on every page.
+    text = MARKUP_PATTERN.sub(" ", text)
+    text = DIGITS_PATTERN.sub("#", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+def _edge_lines(text: str) -> List[Tuple[int, int, str, str]]:
+    # (start, end, side, normalized text) of the first and last non-blank lines.
+    lines = []
+    for match in LINE_PATTERN.finditer(text):
+        if match.start() == len(text):
+            break
+        line = match.group().strip()
+        if not line:
+            continue
+        # Headings, table rows and images belong to the page's structure.
+        kept = HEADING_PATTERN.match(line) or line.startswith("|") or any(markup in line for markup in IMAGE_MARKUP)
+        numbered = DIGITS_PATTERN.search(line) and len(line.split()) > BOILERPLATE_NUMBERED_WORDS
+        lines.append((match.start(), match.end(), "" if kept or numbered else normalize_line(line)))
+    top = lines[:BOILERPLATE_EDGE_LINES]
+    bottom = lines[max(BOILERPLATE_EDGE_LINES, len(lines) - BOILERPLATE_EDGE_LINES):]
+    return [
+        (start, end, side, normalized)
+        for side, edge in (("top", top), ("bottom", bottom))
+        for start, end, normalized in edge
+        if normalized
+    ]
+
+
+def _word_lines(words: List) -> Dict[str, Set[int]]:
+    # Normalized text of every word line, with the positions it appears at.
+    # Words are (x0, y0, x1, y1, text, block, line, word) tuples.
+    lines: Dict[Tuple, Tuple[float, List[str]]] = {}
+    for word in words:
+        if len(word) < 7:
+            continue
+        key = (word[5], word[6])
+        y0, texts = lines.get(key, (word[1], []))
+        texts.append(str(word[4]))
+        lines[key] = (min(y0, word[1]), texts)
+    positions: Dict[str, Set[int]] = {}
+    for y0, texts in lines.values():
+        normalized = normalize_line(" ".join(texts))
+        if normalized:
+            positions.setdefault(normalized, set()).add(round(y0 / BOILERPLATE_Y_TOLERANCE))
+    return positions
+
+
+def _candidates(edges: List[Tuple[int, int, str, str]], positions: Optional[Dict[str, Set[int]]]) -> Set[Tuple]:
+    # With words, a line is identified by its text and its position on the
+    # page; without them, by its text and the page edge it is on.
+    if positions is None:
+        return {(side, normalized) for _, _, side, normalized in edges}
+    return {
+        ("y", position, normalized)
+        for _, _, _, normalized in edges
+        for position in positions.get(normalized, ())
+    }
+
+
+def strip_boilerplate(items: List[PDFResult]) -> List[str]:
+    """Remove running headers, footers and page numbers from the page texts.
+
+    The first and last few lines of every page are normalized (digits,
+    emphasis and whitespace) and keyed by their position: the y coordinate of
+    the matching word line when the page has words, or else the page edge they
+    are on. Lines whose key recurs on enough pages are cut from the page text,
+    unless that would leave the page empty. Returns the removed text of each
+    page.
+    """
+    pages = []
+    counts: Counter = Counter()
+    for item in items:
+        edges = _edge_lines(item.text)
+        positions = _word_lines(item.words) if item.words else None
+        candidates = _candidates(edges, positions)
+        pages.append((edges, candidates))
+        counts.update(candidates)
+
+    threshold = max(BOILERPLATE_MIN_PAGES, math.ceil(BOILERPLATE_PAGE_RATIO * len(items)))
+    boilerplate = {key for key, count in counts.items() if count >= threshold}
+    removed_texts = []
+    for item, (edges, candidates) in zip(items, pages):
+        repeated = {key[-1] for key in candidates & boilerplate}
+        removed = [(start, end) for start, end, _, normalized in edges if normalized in repeated]
+        kept = []
+        position = 0
+        for start, end in removed:
+            kept.append(item.text[position:start])
+            position = end
+        kept.append(item.text[position:])
+        text = "".join(kept)
+        if not removed or not text.strip():
+            removed_texts.append("")
+            continue
+        removed_texts.append("".join(item.text[start:end] for start, end in removed))
+        # A removed header leaves the blank lines that followed it.
+        item.text = text.lstrip("\n") if not item.text[:removed[0][0]].strip() else text
+    return removed_texts
@@ -1,15 +1,76 @@
-from ..models import PDFResult, FormattedResult, FormattedMetadata, FormattedElements, Link, Table, Image
-from typing import List, Optional
-import tiktoken
-from langdetect import detect as detect_language
+from ..models import PDFResult, FormattedResult, FormattedMetadata, FormattedElements, Link, Table, Image, Chunk
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .markdown_scanner import ScannedMarkdown, scan_markdown
+from .tokenizer import get_encoding
+from .token_estimator import estimate_tokens
+from .stitcher import stitch_pages
+from .boilerplate import strip_boilerplate
+from .normalizer import normalize_markdown
+from .language import MIN_PAGE_LANGUAGE_CHARS, PAGE_LANGUAGE_CHARS, DocumentLanguage, detect_document_language, detect_language_memoized
+from ..cache.page_memo import PageMemo
+from ..utils.sharding import shard_bounds
+from ..chunker.chunker import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_TOKENS, ChunkSource, check_chunk_options, chunk_pages, chunk_sections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import hashlib
+import math
 import re
 
+TOKENIZER_MODEL = "gpt-4o"
+TOKEN_THREADS = 8
+TOKEN_COUNTERS = ("exact", "approx")
+FORMAT_POOLS = ("thread", "process")
+# Base64 tokenizes at about 1.4 characters per token, so inline image payloads
+# are estimated from their length instead of being encoded.
+BASE64_CHARS_PER_TOKEN = 1.4
+DATA_URI_PATTERN = re.compile(r'data:image/[^;]+;base64,')
+
+
+def _prepare_pages(items: List[PDFResult], options: Dict[str, Any]) -> List[Tuple[FormattedResult, str, Optional[str]]]:
+    # Runs in a worker process on one shard of pages.
+    formatter = FormatterMD(items, **options)
+    return [formatter._prepare_page(item) for item in items]
+
+
 class FormatterMD:
-    def __init__(self, content: List[PDFResult], keep_images_inline: bool = False):
+    def __init__(
+        self,
+        content: List[PDFResult],
+        keep_images_inline: bool = False,
+        token_threads: int = TOKEN_THREADS,
+        token_counter: str = "exact",
+        encodings: Optional[List[str]] = None,
+        page_languages: bool = False,
+        memo: Optional[PageMemo] = None,
+        workers: int = 1,
+        pool: str = "thread",
+        stitch: bool = False,
+        strip_boilerplate: bool = False,
+        normalize_text: bool = False
+    ):
+        if token_counter not in TOKEN_COUNTERS:
+            raise ValueError(f"[FORMATTER] token_counter must be one of {', '.join(TOKEN_COUNTERS)}.")
+        if pool not in FORMAT_POOLS:
+            raise ValueError(f"[FORMATTER] pool must be one of {', '.join(FORMAT_POOLS)}.")
         self.content = content
-        self.encoding = tiktoken.encoding_for_model("gpt-4o")
         self.keep_images_inline = keep_images_inline
+        self.token_threads = token_threads
+        self.token_counter = token_counter
+        self.encodings = list(encodings or [])
+        self.page_languages = page_languages
+        self.memo = memo
+        self.workers = workers
+        self.pool = pool
+        self.stitch = stitch
+        self.strip_boilerplate = strip_boilerplate
+        self.normalize_text = normalize_text
+        # Filled by format(); format_chunks() reuses the token ids.
+        self.keep_token_ids = False
+        self.masked_texts: List[str] = []
+        self.token_ids: List[List[int]] = []
+
+    @property
+    def encoding(self):
+        return get_encoding(TOKENIZER_MODEL)
 
     def _check_content(self):
         if not isinstance(self.content, list):
@@ -24,116 +85,314 @@ class FormatterMD:
                 if not item.text or not item.text.strip():
                     raise ValueError("[FORMATTER] Content text is empty.")
             
-    def _count_markdown_elements(self, text):
+    def _count_markdown_elements(self, text: str, scanned: Optional[ScannedMarkdown] = None):
         try:
-            titles = re.findall(r'^\s*#{1,6}\s+.+$', text, re.MULTILINE)
-            ordered_lists = re.findall(r'^\s*\d+[.)]\s+.+', text, re.MULTILINE)
-            unordered_lists = re.findall(r'^\s*[-*+]\s+.+', text, re.MULTILINE)
-            links = []
-
-            md_links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', text)
-            for link_text, link_url in md_links:
-                links.append(Link(text=link_text, url=link_url))
-            
-            html_links = re.findall(r'<(https?://[^>]+)>', text)
-            for url in html_links:
-                links.append(Link(text=url, url=url))
-            lists = ordered_lists + unordered_lists
+            scanned = scanned or scan_markdown(text)
             return {
-                'titles': [] if not titles else titles,
-                'lists': [] if not lists else lists,
-                'links': [] if not links else links
+                'titles': [title.text for title in scanned.titles],
+                'lists': [list_item.text for list_item in scanned.lists],
+                'links': [Link(text=link.text, url=link.url) for link in scanned.links]
             }
         except Exception as e:
             raise ValueError(f"[FORMATTER] Error counting markdown elements: {e}")
         
-    def _extract_tables(self, text: str) -> List[Optional[str]]:
+    def _extract_tables(self, text: str, scanned: Optional[ScannedMarkdown] = None) -> List[Optional[str]]:
         try:
-            table_pattern = r'(?:\|[^\n]*\|\n)+(?:\|[-:| ]*\|\n)(?:\|[^\n]*\|\n)+'
-            
-            tables = re.findall(table_pattern, text, re.MULTILINE)
-            
-            return tables
+            scanned = scanned or scan_markdown(text)
+            return [table.text for table in scanned.tables]
         except Exception as e:
             raise ValueError(f"[FORMATTER] Error extracting tables from text: {e}")
     
-    def _extract_images(self, text: str) -> List[Optional[str]]:
+    def _extract_images(self, text: str, scanned: Optional[ScannedMarkdown] = None) -> List[Optional[str]]:
         try:
-            image_pattern = r'(?:!\[.*?\]\((data:image\/[^;]+;base64,[^)]+)\)|<img[^>]*src="(data:image\/[^;]+;base64,[^"]+)"[^>]*>)'
-            images = re.findall(image_pattern, text, re.MULTILINE)
-            return images
+            scanned = scanned or scan_markdown(text)
+            # One (markdown source, html source) pair per embedded data URI.
+            return [
+                ("", image.source) if image.html else (image.source, "")
+                for image in scanned.images
+                if image.html or DATA_URI_PATTERN.match(image.source)
+            ]
         except Exception as e:
             raise ValueError(f"[FORMATTER] Error extracting images from text: {e}")
         
-    def format(self) -> List[FormattedResult]:
+    def _replace_images(self, text: str, scanned: ScannedMarkdown, image_hashes: Dict[str, str]) -> str:
+        # Rebuild the text once from the scanned image offsets, giving every
+        # image its own [IMAGE](hash) reference.
+        parts = []
+        position = 0
+        for image in scanned.images:
+            image_hash = image_hashes.get(image.source)
+            if image_hash is None:
+                continue
+            parts.append(text[position:image.start])
+            parts.append(f'[IMAGE]({image_hash})')
+            position = image.end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _memoized(self, namespace: str, texts: List[str], compute: Callable[[List[str]], List[Any]]) -> List[Any]:
+        if self.memo is None:
+            return compute(texts)
+        return self.memo.get_many(namespace, texts, compute)
+
+    def _encode(self, encoding, texts: List[str]) -> List[List[int]]:
+        # tiktoken encodes the batch on native threads without holding the GIL.
+        if len(texts) == 1:
+            return [encoding.encode_ordinary(texts[0])]
+        return encoding.encode_ordinary_batch(texts, num_threads=self.token_threads)
+
+    def _encoded_lengths(self, encoding, texts: List[str]) -> List[int]:
+        return [len(tokens) for tokens in self._encode(encoding, texts)]
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        if self.token_counter == "approx":
+            # Not memoized: estimating costs about as much as hashing the text.
+            return [estimate_tokens(text) for text in texts]
+        return self._memoized(f"tokens:{TOKENIZER_MODEL}", texts, lambda missing: self._encoded_lengths(self.encoding, missing))
+
+    def _count_tokens_by_encoding(self, texts: List[str]) -> List[Dict[str, int]]:
+        # One batched encode per requested encoding, always exact.
+        counts = [{} for _ in texts]
+        for name in self.encodings:
+            lengths = self._memoized(f"tokens:{name}", texts, lambda missing: self._encoded_lengths(get_encoding(name), missing))
+            for page_counts, length in zip(counts, lengths):
+                page_counts[name] = length
+        return counts
+
+    def _normalized(self, items: Iterator[PDFResult]) -> Iterator[PDFResult]:
+        # Runs before stitching, whose spans refer to the normalized text.
+        for item in items:
+            if isinstance(item, PDFResult) and item.text:
+                item.text = normalize_markdown(item.text)
+            yield item
+
+    def _format_page(self, item: PDFResult) -> Tuple[FormattedResult, str]:
+        # Returns the formatted page without its token count, and the text that
+        # tokens are counted on: the page text with image payloads masked out.
+        original_length = len(item.text)
         try:
-            self._check_content()
-            results = []
-            for item in self.content:
-                markdown_elements = self._count_markdown_elements(item.text)
-                extracted_tables = self._extract_tables(item.text)
-                extracted_images = self._extract_images(item.text)
-                tables_with_content = []
-                if hasattr(item, 'tables') and item.tables:
-                    for i, table in enumerate(item.tables):
-                        table_content = extracted_tables[i] if i < len(extracted_tables) else None
-                        tables_with_content.append(Table(
-                            bbox=table.bbox,
-                            rows=table.rows,
-                            columns=table.columns,
-                            content=table_content
-                        ))
-                        
-                images_with_content = []
-                
-                if hasattr(item, 'images') and item.images:
-                    for i, image in enumerate(item.images):
-                        image_content = extracted_images[i][0] if i < len(extracted_images) else None
-                        image_content = extracted_images[i][0] if i < len(extracted_images) and extracted_images[i][0] else ""
-                        image_hash = hashlib.md5(image_content.encode()).hexdigest() if image_content else None
-                        
-                        if image_content:
-                            if not self.keep_images_inline:
-                                item.text = re.sub(r'!\[.*?\]\((data:image\/[^;]+;base64,[^)]+)\)', f'[IMAGE]({image_hash})', item.text, flags=re.DOTALL)
-                                
-                            image_content = f'{image_content.split("=")[0]}='
-                                
-                        images_with_content.append(Image(
-                            number=image.number,
-                            bbox=image.bbox,
-                            width=image.width,
-                            height=image.height,
-                            base64=image_content,
-                            hash=image_hash
-                        ))
+            scanned = scan_markdown(item.text)
+        except Exception as e:
+            raise ValueError(f"[FORMATTER] Error scanning markdown: {e}")
+        markdown_elements = self._count_markdown_elements(item.text, scanned)
+        extracted_tables = self._extract_tables(item.text, scanned)
+        extracted_images = self._extract_images(item.text, scanned)
+        tables_with_content = []
+        if hasattr(item, 'tables') and item.tables:
+            for i, table in enumerate(item.tables):
+                table_content = extracted_tables[i] if i < len(extracted_tables) else None
+                tables_with_content.append(Table(
+                    bbox=table.bbox,
+                    rows=table.rows,
+                    columns=table.columns,
+                    content=table_content
+                ))
                 
-                formatted_data = FormattedResult(
-                    metadata=FormattedMetadata(
-                        file_path=item.metadata.file_path,
-                        page=item.metadata.page,
-                        page_count=item.metadata.page_count,
-                        text_length=len(item.text) if item.text else 0,
-                    ),
-                    elements=FormattedElements(
-                        tables=tables_with_content,
-                        images=images_with_content,
-                        titles=markdown_elements['titles'],
-                        lists=markdown_elements['lists'],
-                        links=markdown_elements['links'],
-                    ),
-                    text=item.text or "",
-                    tokens=len(self.encoding.encode(item.text)) if item.text else 0,
-                    language=None
-                )
+        image_hashes = {}
+        for markdown_source, html_source in extracted_images:
+            image_source = markdown_source or html_source
+            if image_source not in image_hashes:
+                image_hashes[image_source] = hashlib.md5(image_source.encode()).hexdigest()
+        stored_hashes = {}
+        images_with_content = []
+        
+        if hasattr(item, 'images') and item.images:
+            for i, image in enumerate(item.images):
+                if image.path:
+                    # Already written to an image store: the text holds a plain
+                    # reference and there is no base64 payload to extract.
+                    stored_hashes[image.path] = image.hash
+                    images_with_content.append(Image(
+                        number=image.number,
+                        bbox=image.bbox,
+                        width=image.width,
+                        height=image.height,
+                        hash=image.hash,
+                        path=image.path
+                    ))
+                    continue
+                image_content = "".join(extracted_images[i]) if i < len(extracted_images) else ""
+                image_hash = image_hashes.get(image_content)
                 
-                if item.text and item.text.strip():
-                    try:
-                        formatted_data.language = detect_language(item.text)
-                    except Exception:
-                        pass
+                if image_content:
+                    image_content = f'{image_content.split("=")[0]}='
                         
-                results.append(formatted_data)
-            return results
+                images_with_content.append(Image(
+                    number=image.number,
+                    bbox=image.bbox,
+                    width=image.width,
+                    height=image.height,
+                    base64=image_content,
+                    hash=image_hash
+                ))
 
+        image_tokens = 0
+        if not self.keep_images_inline:
+            if image_hashes or stored_hashes:
+                item.text = self._replace_images(item.text, scanned, {**image_hashes, **stored_hashes})
+            masked_text = item.text
+        elif image_hashes:
+            masked_text = self._replace_images(item.text, scanned, image_hashes)
+            image_tokens = sum(
+                math.ceil(len(image.source) / BASE64_CHARS_PER_TOKEN)
+                for image in scanned.images if image.source in image_hashes
+            )
+        else:
+            masked_text = item.text
+        
+        formatted_data = FormattedResult(
+            metadata=FormattedMetadata(
+                file_path=item.metadata.file_path,
+                page=item.metadata.page,
+                page_count=item.metadata.page_count,
+                text_length=len(item.text) if item.text else 0,
+            ),
+            elements=FormattedElements(
+                tables=tables_with_content,
+                images=images_with_content,
+                titles=markdown_elements['titles'],
+                lists=markdown_elements['lists'],
+                links=markdown_elements['links'],
+            ),
+            text=item.text or "",
+            tokens=0,
+            image_tokens=image_tokens,
+            language=None,
+            # Stitched text sits at the end of the page, after every image.
+            stitched=[
+                stitched.model_copy(update={
+                    'start': stitched.start + len(item.text) - original_length,
+                    'end': stitched.end + len(item.text) - original_length,
+                })
+                for stitched in item.stitched
+            ]
+        )
+                
+        return formatted_data, masked_text
+
+    def _detect_page_language(self, masked_text: str) -> Optional[str]:
+        if not self.page_languages or len(masked_text.strip()) < MIN_PAGE_LANGUAGE_CHARS:
+            return None
+        try:
+            return detect_language_memoized(masked_text, PAGE_LANGUAGE_CHARS, self.memo)
+        except Exception:
+            return None
+
+    def _prepare_page(self, item: PDFResult) -> Tuple[FormattedResult, str, Optional[str]]:
+        # Everything that depends on the page alone: scanning, image hashing and
+        # the page's own language. Tokens and the document language come after.
+        formatted_data, masked_text = self._format_page(item)
+        return formatted_data, masked_text, self._detect_page_language(masked_text)
+
+    def _prepare_pages(self) -> List[Tuple[FormattedResult, str, Optional[str]]]:
+        if self.workers <= 1 or len(self.content) < 2:
+            return [self._prepare_page(item) for item in self.content]
+        if self.pool == "thread":
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(self._prepare_page, self.content))
+        options = {
+            'keep_images_inline': self.keep_images_inline,
+            'page_languages': self.page_languages,
+            'memo': self.memo,
+        }
+        shards = [self.content[start:end] for start, end in shard_bounds(len(self.content), self.workers)]
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            futures = [executor.submit(_prepare_pages, shard, options) for shard in shards]
+            return [page for future in futures for page in future.result()]
+
+    def _document_language(self, masked_texts: List[str]) -> Optional[str]:
+        try:
+            return detect_document_language(masked_texts, self.memo)
+        except Exception:
+            return None
+
+    def _page_language(self, masked_text: str, document_language: DocumentLanguage, page_language: Optional[str] = None) -> Optional[str]:
+        try:
+            language = document_language.add_page(masked_text)
+        except Exception:
+            language = None
+        return page_language or language
+
+    def _format_item(self, item: PDFResult, document_language: DocumentLanguage) -> FormattedResult:
+        formatted_data, masked_text, page_language = self._prepare_page(item)
+        formatted_data.tokens = self._count_tokens([masked_text])[0] if masked_text else 0
+        formatted_data.tokens_by_encoding = self._count_tokens_by_encoding([masked_text])[0]
+        formatted_data.language = self._page_language(masked_text, document_language, page_language)
+        return formatted_data
+
+    def format(self) -> List[FormattedResult]:
+        try:
+            self._check_content()
+            # Headers and footers go first: a footer would end every page
+            # before stitching could join it to the next one.
+            removed_texts = strip_boilerplate(self.content) if self.strip_boilerplate else []
+            if self.normalize_text:
+                self.content = list(self._normalized(self.content))
+            if self.stitch:
+                self.content = list(stitch_pages(self.content))
+            pages = self._prepare_pages()
+            masked_texts = [masked_text for _, masked_text, _ in pages]
+            self.masked_texts = masked_texts
+            if self.keep_token_ids:
+                self.token_ids = self._encode(self.encoding, masked_texts)
+            if self.keep_token_ids and self.token_counter == "exact":
+                page_tokens = [len(tokens) for tokens in self.token_ids]
+            else:
+                page_tokens = self._count_tokens(masked_texts)
+            token_counts = zip(page_tokens, self._count_tokens_by_encoding(masked_texts))
+            # Every page is at hand, so the whole document is sampled first and
+            # a short cover page cannot decide the language of the pages after it.
+            document_language = self._document_language(masked_texts)
+            for (result, _, page_language), (tokens, tokens_by_encoding) in zip(pages, token_counts):
+                result.tokens = tokens
+                result.tokens_by_encoding = tokens_by_encoding
+                result.language = page_language or document_language
+            if any(removed_texts):
+                removed_tokens = iter(self._count_tokens([text for text in removed_texts if text]))
+                for (result, _, _), removed_text in zip(pages, removed_texts):
+                    if removed_text:
+                        result.boilerplate_tokens = next(removed_tokens)
+            return [result for result, _, _ in pages]
         except Exception as e:
             raise ValueError(f"[FORMATTER] Error formatting content: {e}")
+
+    def format_chunks(self, max_tokens: int = DEFAULT_CHUNK_TOKENS, overlap: int = DEFAULT_CHUNK_OVERLAP, sections: bool = False) -> List[Chunk]:
+        check_chunk_options(max_tokens, overlap)
+        self.keep_token_ids = True
+        results = self.format()
+        try:
+            sources = [
+                ChunkSource(result.metadata.page, masked_text, token_ids, item.toc_items, [
+                    stitched.model_copy(update={
+                        'start': stitched.start + len(masked_text) - len(result.text),
+                        'end': stitched.end + len(masked_text) - len(result.text),
+                    })
+                    for stitched in result.stitched
+                ])
+                for result, masked_text, token_ids, item in zip(results, self.masked_texts, self.token_ids, self.content)
+            ]
+            if sections:
+                return chunk_sections(sources, self.encoding, max_tokens, overlap)
+            return chunk_pages(sources, self.encoding, max_tokens, overlap)
+        except Exception as e:
+            raise ValueError(f"[FORMATTER] Error chunking content: {e}")
+
+    def format_iter(self) -> Iterator[FormattedResult]:
+        if self.strip_boilerplate:
+            raise ValueError("[FORMATTER] strip_boilerplate needs every page at once; use format().")
+        formatted_pages = 0
+        document_language = DocumentLanguage(self.memo)
+        items = self._normalized(self.content) if self.normalize_text else self.content
+        for item in stitch_pages(items) if self.stitch else items:
+            try:
+                if not isinstance(item, PDFResult):
+                    raise ValueError("[FORMATTER] Content must be a List of PDFResult.")
+                if not item.text or not item.text.strip():
+                    raise ValueError("[FORMATTER] Content text is empty.")
+                formatted_data = self._format_item(item, document_language)
+            except Exception as e:
+                raise ValueError(f"[FORMATTER] Error formatting content: {e}")
+            formatted_pages += 1
+            yield formatted_data
+        if not formatted_pages:
+            raise ValueError("[FORMATTER] Error formatting content: [FORMATTER] Content is empty.")
@@ -0,0 +1,98 @@
+from typing import List, Optional
+from langdetect import detector_factory
+from langdetect.lang_detect_exception import LangDetectException
+from ..cache.page_memo import PageMemo
+
+LANGUAGE_SEED = 0
+# The document language is detected from a sample made of a prefix of some
+# pages, and per-page detection only reads a prefix of the page; langdetect
+# would otherwise clean and scan the full text of every page.
+LANGUAGE_SAMPLE_PAGES = 8
+LANGUAGE_SAMPLE_CHARS = 1500
+LANGUAGE_SETTLE_CHARS = 1000
+PAGE_LANGUAGE_CHARS = 2000
+# Pages shorter than this keep the document language: detection on a few words
+# is mostly noise.
+MIN_PAGE_LANGUAGE_CHARS = 200
+
+
+def detect_language(text: str, max_chars: int = PAGE_LANGUAGE_CHARS) -> Optional[str]:
+    """Detect the language of a text prefix with a seeded, reproducible detector."""
+    sample = text[:max_chars]
+    if not sample.strip():
+        return None
+    detector_factory.init_factory()
+    detector = detector_factory._factory.create()
+    detector.seed = LANGUAGE_SEED
+    detector.set_max_text_length(max_chars)
+    detector.append(sample)
+    try:
+        return detector.detect()
+    except LangDetectException:
+        return None
+
+
+def detect_language_memoized(text: str, max_chars: int = PAGE_LANGUAGE_CHARS, memo: Optional[PageMemo] = None) -> Optional[str]:
+    """detect_language(), served from a PageMemo keyed by the detected prefix when one is given."""
+    if memo is None:
+        return detect_language(text, max_chars)
+    return memo.get_many("language", [text[:max_chars]], lambda samples: [detect_language(samples[0], max_chars)])[0]
+
+
+def language_sample(text: str) -> str:
+    """The part of a page text that document language detection reads."""
+    return text.strip()[:LANGUAGE_SAMPLE_CHARS].rstrip()
+
+
+def detect_document_language(texts: List[str], memo: Optional[PageMemo] = None) -> Optional[str]:
+    """Detect one language for a whole document from a bounded sample of its pages.
+
+    The sample takes a prefix of up to LANGUAGE_SAMPLE_PAGES pages spread evenly
+    over the document, LANGUAGE_SAMPLE_CHARS in total. Pages shorter than
+    MIN_PAGE_LANGUAGE_CHARS, such as covers and captions, are left out unless
+    the document has no longer page. The result only depends on the
+    language_sample() of each page.
+    """
+    samples = [language_sample(text) for text in texts]
+    pages = [sample for sample in samples if len(sample) >= MIN_PAGE_LANGUAGE_CHARS] or [sample for sample in samples if sample]
+    if not pages:
+        return None
+    count = min(LANGUAGE_SAMPLE_PAGES, len(pages))
+    parts = []
+    used = 0
+    for i in range(count):
+        # Each page gets an even share of what is left, so short pages leave
+        # their unused share to the following ones.
+        part = pages[i * len(pages) // count][:(LANGUAGE_SAMPLE_CHARS - used) // (count - i)]
+        parts.append(part)
+        used += len(part) + 1
+    sample = "\n".join(parts)[:LANGUAGE_SAMPLE_CHARS]
+    return detect_language_memoized(sample, len(sample), memo)
+
+
+class DocumentLanguage:
+    """Detects one language per streamed document from a sample of its leading pages.
+
+    Pages are added in order. Until the sample is long enough, each page gets the
+    language detected from the sample so far; from then on the language is fixed.
+    This needs no look-ahead, so format_iter() can yield every page at once;
+    format() sees every page and uses detect_document_language() instead.
+    """
+
+    def __init__(self, memo: Optional[PageMemo] = None):
+        self.memo = memo
+        self.sample = []
+        self.language = None
+        self.settled = False
+
+    def add_page(self, text: str) -> Optional[str]:
+        if not self.settled:
+            self.sample.append(text[:LANGUAGE_SAMPLE_CHARS])
+            sample = "\n".join(self.sample)
+            self.language = detect_language_memoized(sample, len(sample), self.memo)
+            self.settled = len(self.sample) >= LANGUAGE_SAMPLE_PAGES or (
+                self.language is not None and len(sample) >= LANGUAGE_SETTLE_CHARS
+            )
+            if self.settled:
+                self.sample = []
+        return self.language
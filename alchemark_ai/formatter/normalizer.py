@@ -0,0 +1,75 @@
+import re
+
+FENCE_PATTERN = re.compile(r'[^\S\n]*(?:```|~~~)')
+# Lines that stand on their own: headings, tables, quotes, images, html,
+# rules and indented lines are never joined to their neighbours.
+STANDALONE_PATTERN = re.compile(r'(?:#{1,6}\s|\||>|!\[|<|[-*_](?:[^\S\n]*[-*_]){2,}[^\S\n]*$| {4}|\t)')
+# List items start a line, but the wrapped lines that follow them are joined.
+LIST_ITEM_PATTERN = re.compile(r'[^\S\n]*(?:[-*+]|\d+[.)])[^\S\n]')
+SPACES_PATTERN = re.compile(r'[^\S\n]+')
+HYPHENATED_PATTERN = re.compile(r'[^\W\d_]-$')
+
+
+def normalize_markdown(text: str) -> str:
+    """Reflow hard-wrapped markdown and collapse its whitespace in one pass.
+
+    Lines are read once, in order. Wrapped prose and list item lines are joined
+    into one line per paragraph or item, and a word hyphenated at the end of a
+    line is joined with the start of the next one, dropping the hyphen when
+    that starts in lowercase. Runs of spaces become one space and runs of
+    blank lines one blank line. Fenced code is kept as it is, and headings,
+    table rows, quotes, images, rules and indented lines keep their own lines.
+    """
+    lines = []
+    # The paragraph or list item being joined, as a list of parts.
+    paragraph = []
+    in_code = False
+    for line in text.split("\n"):
+        if FENCE_PATTERN.match(line):
+            in_code = not in_code
+        elif in_code:
+            lines.append(line)
+            continue
+        stripped = line.strip()
+        if not stripped:
+            if paragraph:
+                lines.append("".join(paragraph))
+                paragraph = []
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if FENCE_PATTERN.match(line):
+            if paragraph:
+                lines.append("".join(paragraph))
+                paragraph = []
+            lines.append(line.rstrip())
+            continue
+        list_item = LIST_ITEM_PATTERN.match(line)
+        if list_item or STANDALONE_PATTERN.match(line):
+            if paragraph:
+                lines.append("".join(paragraph))
+                paragraph = []
+            # Keep the indentation of nested list items and indented lines.
+            indent = line[:len(line) - len(line.lstrip())]
+            if list_item:
+                paragraph = [indent, SPACES_PATTERN.sub(" ", stripped)]
+            else:
+                lines.append(indent + SPACES_PATTERN.sub(" ", stripped))
+            continue
+        stripped = SPACES_PATTERN.sub(" ", stripped)
+        if not paragraph:
+            paragraph = [stripped]
+        elif HYPHENATED_PATTERN.search(paragraph[-1]):
+            # A word broken across lines; the hyphen stays before a capital or
+            # a digit, as in "Well-Known" or "pre-2020".
+            if stripped[0].islower():
+                paragraph[-1] = paragraph[-1][:-1]
+            paragraph.append(stripped)
+        else:
+            paragraph.append(" ")
+            paragraph.append(stripped)
+    if paragraph:
+        lines.append("".join(paragraph))
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+from ..models import PDFResult, StitchedText
+import re
+
+BLANK_LINE_PATTERN = re.compile(r'\n[^\S\n]*\n')
+# Lines that start something other than running prose.
+BLOCK_MARKUP_PATTERN = re.compile(r'[^\S\n]*(?:#{1,6}[^\S\n]|[-*+>|][^\S\n]|\d+[.)][^\S\n]|\||```|!\[|<)')
+SENTENCE_END_PATTERN = re.compile(r'[.!?:;][\'")\]»”’*_]*$')
+TABLE_SEPARATOR_PATTERN = re.compile(r'\|[-:| ]*\|')
+IMAGE_MARKUP = ("![", "<img", "[IMAGE](")
+
+
+def _last_block(text: str) -> Tuple[int, str]:
+    # Start and text of the last block of a right-stripped page text.
+    start = 0
+    for match in BLANK_LINE_PATTERN.finditer(text):
+        start = match.end()
+    return start, text[start:]
+
+
+def _first_block(text: str) -> Tuple[str, str]:
+    # First block of a left-stripped page text, and the text after it.
+    match = BLANK_LINE_PATTERN.search(text)
+    if match is None:
+        return text, ""
+    return text[:match.start()], text[match.end():]
+
+
+def _table_rows(block: str) -> Optional[List[str]]:
+    lines = [line.strip() for line in block.split("\n")]
+    if len(lines) < 2 or not all(line.startswith("|") for line in lines):
+        return None
+    if not TABLE_SEPARATOR_PATTERN.fullmatch(lines[1]):
+        return None
+    return lines
+
+
+def _is_prose(block: str) -> bool:
+    return bool(block) and not BLOCK_MARKUP_PATTERN.match(block) and not any(markup in block for markup in IMAGE_MARKUP)
+
+
+def _normalize_row(row: str) -> str:
+    return "|".join(cell.strip().lower() for cell in row.split("|"))
+
+
+def _stitch(previous: PDFResult, item: PDFResult):
+    head = previous.text.rstrip()
+    tail = item.text.lstrip()
+    block_start, last = _last_block(head)
+    first, rest = _first_block(tail)
+    if not rest.strip():
+        # Moving the whole next page would leave it empty.
+        return
+
+    previous_rows, next_rows = _table_rows(last), _table_rows(first)
+    if previous_rows and next_rows:
+        # A table continues when the next page repeats its header row.
+        if _normalize_row(previous_rows[0]) != _normalize_row(next_rows[0]) or len(next_rows) < 3:
+            return
+        joiner, moved = "\n", "\n".join(next_rows[2:])
+        if previous.tables:
+            previous.tables[-1].rows += len(next_rows) - 2
+        if item.tables:
+            item.tables.pop(0)
+    elif _is_prose(last) and _is_prose(first) and first[0].islower() and not SENTENCE_END_PATTERN.search(last):
+        # A paragraph continues when it stops mid-sentence and the next page
+        # starts in lowercase.
+        joiner = "" if last.endswith("-") else " "
+        moved = " ".join(line.strip() for line in first.split("\n"))
+    else:
+        return
+
+    # Keep the page's trailing whitespace; table rows must end with a newline.
+    suffix = previous.text[len(head):]
+    if previous_rows and not suffix.startswith("\n"):
+        suffix = "\n" + suffix
+    start = len(head) + len(joiner)
+    previous.text = head + joiner + moved + suffix
+    previous.stitched.append(StitchedText(page=item.metadata.page, start=start, end=start + len(moved)))
+    item.text = rest
+
+
+def stitch_pages(items: Iterable[PDFResult]) -> Iterator[PDFResult]:
+    """Join paragraphs and tables that a page break split in two.
+
+    Adjacent pages are compared once, in order, with one page of look-ahead.
+    A continuation is moved from the top of the next page to the end of the
+    previous one, which records the moved characters in its stitched list.
+    Table continuations drop the repeated header and separator rows.
+    """
+    previous = None
+    for item in items:
+        if isinstance(previous, PDFResult) and isinstance(item, PDFResult) and previous.text and item.text:
+            _stitch(previous, item)
+        if previous is not None:
+            yield previous
+        previous = item
+    if previous is not None:
+        yield previous
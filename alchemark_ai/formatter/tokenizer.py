@@ -0,0 +1,21 @@
+import threading
+from typing import Dict
+import tiktoken
+
+_encodings: Dict[str, tiktoken.Encoding] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(name: str) -> tiktoken.Encoding:
+    """Return the process-wide tiktoken encoding for a model or encoding name, loading it on first use."""
+    encoding = _encodings.get(name)
+    if encoding is None:
+        with _encodings_lock:
+            encoding = _encodings.get(name)
+            if encoding is None:
+                if name in tiktoken.list_encoding_names():
+                    encoding = tiktoken.get_encoding(name)
+                else:
+                    encoding = tiktoken.encoding_for_model(name)
+                _encodings[name] = encoding
+    return encoding
@@ -0,0 +1,3 @@
+from .image_store import ImageStore, DirectoryImageStore
+
+__all__ = ['ImageStore', 'DirectoryImageStore']
\ No newline at end of file
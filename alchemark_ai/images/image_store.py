@@ -0,0 +1,191 @@
+import hashlib
+from abc import ABC, abstractmethod
+import os
+import re
+import tempfile
+import pymupdf
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from ..models import PDFResult
+from ..models.PDFResult import Image
+from ..utils.files import write_atomic
+
+IMAGE_REFERENCE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+# pymupdf4llm names a staged render after its page and its rank on the page.
+STAGED_INDEX_PATTERN = re.compile(r'-(\d+)\.\w+$')
+
+
+def _staged_index(target: str) -> int:
+    match = STAGED_INDEX_PATTERN.search(target)
+    return int(match.group(1)) if match else 0
+
+
+class ImageStore(ABC):
+    """
+    Destination for the images extracted from a PDF.
+
+    Subclasses implement put() to save the raw image bytes under a content key
+    and return the reference written into the markdown (a path, URL or key).
+    Stores whose references depend on their configuration (a directory, a
+    bucket) override identifier(), which keys the result cache.
+    """
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, extension: str) -> str:
+        ...
+
+    def identifier(self) -> str:
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+    def put_file(self, key: str, file_path: Path, extension: str) -> str:
+        reference = self.put(key, file_path.read_bytes(), extension)
+        file_path.unlink()
+        return reference
+
+    def staging_dir(self) -> tempfile.TemporaryDirectory:
+        return tempfile.TemporaryDirectory(prefix="alchemark-images-")
+
+    @staticmethod
+    def _xref_image(doc: pymupdf.Document, xref: int) -> Optional[Tuple[bytes, str]]:
+        extracted = doc.extract_image(xref)
+        if not extracted.get("smask"):
+            return extracted["image"], extracted["ext"]
+        # The transparency of the image is a separate soft mask, which the page
+        # render applies; compose it so the stored image looks the same.
+        try:
+            pixmap = pymupdf.Pixmap(doc, xref)
+            if pixmap.n - pixmap.alpha > 3:
+                pixmap = pymupdf.Pixmap(pymupdf.csRGB, pixmap)
+            pixmap = pymupdf.Pixmap(pixmap, pymupdf.Pixmap(doc, extracted["smask"]))
+            return pixmap.tobytes("png"), "png"
+        except Exception:
+            return None
+
+    def _store_xref(self, doc: pymupdf.Document, xref: int, xref_cache: Dict[int, Optional[Tuple[str, str]]]) -> Optional[Tuple[str, str]]:
+        # The embedded image is stored instead of the page render, so a logo
+        # repeated on every page is hashed and stored once per document, and
+        # once across documents. pymupdf4llm still writes a render of every
+        # occurrence to the staging directory, which is discarded. None means
+        # the image must be taken from the render.
+        if xref not in xref_cache:
+            image = self._xref_image(doc, xref)
+            if image is None:
+                xref_cache[xref] = None
+            else:
+                digest = hashlib.sha256(image[0]).hexdigest()
+                xref_cache[xref] = (digest, self.put(digest, image[0], image[1]))
+        return xref_cache[xref]
+
+    @staticmethod
+    def _render_size(file_path: Path) -> Optional[Tuple[int, int, float, float]]:
+        try:
+            pixmap = pymupdf.Pixmap(str(file_path))
+        except Exception:
+            return None
+        return pixmap.width, pixmap.height, pixmap.xres or 72, pixmap.yres or 72
+
+    @staticmethod
+    def _fits(image: Image, size: Optional[Tuple[int, int, float, float]]) -> bool:
+        if size is None:
+            return False
+        width, height, xres, yres = size
+        bbox = image.bbox
+        rendered = (pymupdf.Rect(bbox.x0, bbox.y0, bbox.x1, bbox.y1) * pymupdf.Matrix(xres / 72, yres / 72)).irect
+        return abs(rendered.width - width) <= 1 and abs(rendered.height - height) <= 1
+
+    def _match_renders(self, item: PDFResult, targets: List[str]) -> Dict[str, Image]:
+        # pymupdf4llm lists the images of a page by area, but renders them, and
+        # vector graphics, in reading order, numbering each render by its rank
+        # in that order. A render belongs to the image whose rect has its pixel
+        # size; images of the same size are taken in reading order. A render
+        # with no unique match (graphics, or an image the size of some
+        # graphics) is not attributed to any image.
+        renders = sorted(targets, key=_staged_index)
+        sizes = {target: self._render_size(Path(target)) for target in renders}
+        unmatched = sorted(item.images, key=lambda image: (image.bbox.y1, image.bbox.x0))
+        matches = {}
+        for position, target in enumerate(renders):
+            candidates = [image for image in unmatched if self._fits(image, sizes[target])]
+            same_size = [other for other in renders[position:] if sizes[other] == sizes[target]]
+            if candidates and len(candidates) == len(same_size):
+                matches[target] = candidates[0]
+                unmatched.remove(candidates[0])
+        return matches
+
+    def store_page_images(
+        self,
+        item: PDFResult,
+        staging_dir: Union[str, os.PathLike],
+        doc: Optional[pymupdf.Document] = None,
+        xref_cache: Optional[Dict[int, Optional[Tuple[str, str]]]] = None
+    ):
+        staging_dir = Path(staging_dir).resolve()
+        xref_cache = {} if xref_cache is None else xref_cache
+        xrefs = {}
+        if doc is not None:
+            page = doc[item.metadata.page - 1]
+            xrefs = {info["number"]: info["xref"] for info in page.get_image_info(xrefs=True)}
+        targets = list(dict.fromkeys(
+            target for _, target in IMAGE_REFERENCE_PATTERN.findall(item.text)
+            if Path(target).resolve().parent == staging_dir
+        ))
+        staged = set(targets)
+        matches = self._match_renders(item, targets)
+        stored = {}
+
+        def store(match: re.Match) -> str:
+            alt_text, target = match.groups()
+            if target not in staged:
+                return match.group(0)
+            if target not in stored:
+                file_path = Path(target)
+                image = matches.get(target)
+                xref = xrefs.get(image.number, 0) if image is not None else 0
+                stored_xref = self._store_xref(doc, xref, xref_cache) if xref > 0 else None
+                if stored_xref is not None:
+                    digest, reference = stored_xref
+                    file_path.unlink()
+                else:
+                    digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+                    reference = self.put_file(digest, file_path, file_path.suffix.lstrip("."))
+                stored[target] = (digest, reference)
+                if image is not None:
+                    image.hash = digest
+                    image.path = reference
+            return f'![{alt_text}]({stored[target][1]})'
+
+        item.text = IMAGE_REFERENCE_PATTERN.sub(store, item.text)
+
+
+class DirectoryImageStore(ImageStore):
+    def __init__(self, directory: Union[str, os.PathLike]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return f"DirectoryImageStore({str(self.directory)!r})"
+
+    def identifier(self) -> str:
+        return f"{super().identifier()}:{self.directory.resolve()}"
+
+    def _image_path(self, key: str, extension: str) -> Path:
+        return self.directory / f"{key}.{extension}" if extension else self.directory / key
+
+    def put(self, key: str, data: bytes, extension: str) -> str:
+        image_path = self._image_path(key, extension)
+        if not image_path.exists():
+            write_atomic(image_path, data)
+        return str(image_path)
+
+    def put_file(self, key: str, file_path: Path, extension: str) -> str:
+        # Staged inside the store directory, so the image is moved into place
+        # rather than copied.
+        image_path = self._image_path(key, extension)
+        if image_path.exists():
+            file_path.unlink()
+        else:
+            os.replace(file_path, image_path)
+        return str(image_path)
+
+    def staging_dir(self) -> tempfile.TemporaryDirectory:
+        return tempfile.TemporaryDirectory(prefix=".staging-", dir=self.directory)
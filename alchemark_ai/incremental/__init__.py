@@ -0,0 +1,3 @@
+from .incremental import IncrementalConverter
+
+__all__ = ['IncrementalConverter']
\ No newline at end of file
@@ -0,0 +1,131 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import pymupdf
+from ..configs.logger import logging
+from ..formatter.formatter_md import FormatterMD
+from ..formatter.language import detect_document_language, language_sample
+from ..models import ConversionManifest, IncrementalResult, ManifestPage
+from ..pdf2md.pdf2md import PDF2MarkDown, PDFSource
+from ..utils.files import write_atomic
+
+
+class IncrementalConverter:
+    def __init__(
+        self,
+        pdf_file_path: PDFSource,
+        manifest_path: Union[str, os.PathLike],
+        process_images: bool = False,
+        keep_images_inline: bool = False,
+        options: Optional[Dict[str, Any]] = None
+    ):
+        self.pdf_converter = PDF2MarkDown(pdf_file_path, process_images)
+        self.manifest_path = Path(manifest_path)
+        self.keep_images_inline = keep_images_inline
+        self.options = options or {}
+
+    def _load_manifest(self) -> Optional[ConversionManifest]:
+        try:
+            return ConversionManifest.model_validate_json(self.manifest_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"[INCREMENTAL] Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return None
+
+    def _save_manifest(self, manifest: ConversionManifest):
+        write_atomic(self.manifest_path, manifest.model_dump_json().encode())
+
+    @staticmethod
+    def _page_fingerprint(doc: pymupdf.Document, page: pymupdf.Page, stream_hashes: Dict[int, str]) -> str:
+        def stream_hash(xref: int) -> str:
+            # Shared resources (logos, fonts, forms) are hashed once per document.
+            if xref not in stream_hashes:
+                stream_hashes[xref] = hashlib.sha256(doc.xref_stream_raw(xref) or b"").hexdigest()
+            return stream_hashes[xref]
+
+        digest = hashlib.sha256()
+        digest.update(page.read_contents())
+        digest.update(repr((tuple(page.rect), page.rotation)).encode())
+        for font in page.get_fonts(full=True):
+            digest.update(repr(font[1:]).encode())
+        for image in page.get_images(full=True):
+            digest.update(stream_hash(image[0]).encode())
+        for xobject in page.get_xobjects():
+            digest.update(stream_hash(xobject[0]).encode())
+        for link in page.get_links():
+            digest.update(repr((link.get("uri"), link.get("page"), tuple(link["from"]))).encode())
+        return digest.hexdigest()
+
+    def fingerprints(self, doc: pymupdf.Document) -> List[str]:
+        stream_hashes = {}
+        return [self._page_fingerprint(doc, page, stream_hashes) for page in doc]
+
+    def _options(self, hdr_info) -> Dict[str, Any]:
+        # Header levels are derived from the whole document, so a change in them
+        # invalidates every page even if its own content is unchanged.
+        header_id = getattr(hdr_info, "header_id", None)
+        return {
+            **self.options,
+            'keep_images_inline': self.keep_images_inline,
+            'process_images': self.pdf_converter.process_images,
+            'headers': {str(size): tag for size, tag in sorted(header_id.items())} if header_id else None,
+        }
+
+    def convert(self) -> IncrementalResult:
+        try:
+            with self.pdf_converter.open_document() as doc:
+                hdr_info = self.pdf_converter.header_info(doc)
+                options = self._options(hdr_info)
+                fingerprints = self.fingerprints(doc)
+
+                manifest = self._load_manifest()
+                previous = {}
+                if manifest is not None and manifest.options == options:
+                    previous = {page.fingerprint: page for page in manifest.pages}
+
+                changed = [i for i, fingerprint in enumerate(fingerprints) if fingerprint not in previous]
+                logging.info(f"[INCREMENTAL] {len(changed)} of {len(fingerprints)} pages changed in {self.pdf_converter._display_name()}.")
+                converted = {}
+                if changed:
+                    markdown_content = self.pdf_converter.convert_pages(doc, changed, hdr_info)
+                    formatter = FormatterMD(markdown_content, self.keep_images_inline)
+                    formatted = formatter.format()
+                    converted = dict(zip(changed, zip(formatted, map(language_sample, formatter.masked_texts))))
+
+            page_count = len(fingerprints)
+            results = []
+            samples = []
+            for i, fingerprint in enumerate(fingerprints):
+                if i in converted:
+                    result, sample = converted[i]
+                else:
+                    # The page may have moved, so renumber the reused result.
+                    result = previous[fingerprint].result.model_copy(deep=True)
+                    sample = previous[fingerprint].language_sample
+                    result.metadata.page = i + 1
+                    result.metadata.page_count = page_count
+                    result.metadata.file_path = self.pdf_converter._source_name()
+                results.append(result)
+                samples.append(sample)
+            # The changed pages were formatted on their own; the document
+            # language is detected again from the samples of every page.
+            document_language = detect_document_language(samples)
+            for result in results:
+                result.language = document_language
+
+            self._save_manifest(ConversionManifest(
+                options=options,
+                pages=[
+                    ManifestPage(fingerprint=fingerprint, result=result, language_sample=sample)
+                    for fingerprint, result, sample in zip(fingerprints, results, samples)
+                ]
+            ))
+            return IncrementalResult(
+                results=results,
+                changed_pages=[i + 1 for i in changed],
+                reused_pages=[i + 1 for i in range(page_count) if i not in converted]
+            )
+        except Exception as e:
+            raise ValueError(f"[INCREMENTAL] Error converting PDF incrementally: {e}")
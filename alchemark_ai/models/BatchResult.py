@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from .FormattedResult import FormattedResult
+
+class BatchResult(BaseModel):
+    file_path: str
+    results: List[FormattedResult] = []
+    error: Optional[str] = None
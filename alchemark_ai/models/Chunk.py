@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+class ChunkSpan(BaseModel):
+    page: int
+    start: int
+    end: int
+
+class Chunk(BaseModel):
+    text: str
+    tokens: int
+    pages: List[int]
+    spans: List[ChunkSpan]
+    headings: List[str] = []
@@ -1,7 +1,7 @@
 import time
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from .PDFResult import Image, Table
+from typing import Dict, List, Optional
+from .PDFResult import Image, StitchedText, Table
 
 class Link(BaseModel):
     text: str
@@ -27,4 +27,8 @@ class FormattedResult(BaseModel):
     elements: FormattedElements
     text: str
     tokens: int
+    image_tokens: int = 0
+    tokens_by_encoding: Dict[str, int] = {}
     language: Optional[str] = None
+    stitched: List[StitchedText] = []
+    boilerplate_tokens: int = 0
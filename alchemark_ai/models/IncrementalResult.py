@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+from .FormattedResult import FormattedResult
+
+class ManifestPage(BaseModel):
+    fingerprint: str
+    result: FormattedResult
+    # What document language detection reads from the page (see language_sample).
+    language_sample: str
+
+class ConversionManifest(BaseModel):
+    options: Dict[str, Any] = {}
+    pages: List[ManifestPage] = []
+
+class IncrementalResult(BaseModel):
+    results: List[FormattedResult]
+    changed_pages: List[int] = []
+    reused_pages: List[int] = []
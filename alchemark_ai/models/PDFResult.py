@@ -31,6 +31,7 @@ class Image(BaseModel):
     height: int
     base64: Optional[str] = None
     hash: Optional[str] = None
+    path: Optional[str] = None
     @model_validator(mode='before')
     @classmethod
     def process_rect(cls, data):
@@ -65,11 +66,19 @@ class Table(BaseModel):
         return data
 
 
+class StitchedText(BaseModel):
+    # Characters [start, end) of a page's text that were moved there from page.
+    page: int
+    start: int
+    end: int
+
+
 class PDFResult(BaseModel):
     metadata: Metadata
     toc_items: List[List[Union[int, str]]]
     tables: List[Table]
     images: List[Image]
-    graphics: List[Dict[str, Any]]
+    graphics: List[Dict[str, Any]] = []
     text: str
-    words: List[Any]
\ No newline at end of file
+    words: List[Any] = []
+    stitched: List[StitchedText] = []
\ No newline at end of file
@@ -1,4 +1,7 @@
 from .PDFResult import PDFResult
-from .FormattedResult import FormattedResult, FormattedMetadata, FormattedElements, Link, Table, Image
+from .FormattedResult import FormattedResult, FormattedMetadata, FormattedElements, Link, Table, Image, StitchedText
+from .BatchResult import BatchResult
+from .Chunk import Chunk, ChunkSpan
+from .IncrementalResult import IncrementalResult, ConversionManifest, ManifestPage
 
-__all__ = ['PDFResult', 'FormattedResult', 'FormattedMetadata', 'FormattedElements', 'Link', 'Table', 'Image']
\ No newline at end of file
+__all__ = ['PDFResult', 'FormattedResult', 'FormattedMetadata', 'FormattedElements', 'Link', 'Table', 'Image', 'StitchedText', 'BatchResult', 'Chunk', 'ChunkSpan', 'IncrementalResult', 'ConversionManifest', 'ManifestPage']
\ No newline at end of file
@@ -1,41 +1,225 @@
+import hashlib
+import os
+import pymupdf
 import pymupdf4llm
 from pathlib import Path
 from ..configs.logger import logging
 from ..models import PDFResult
-from typing import List
+from ..images.image_store import ImageStore
+from ..utils.sharding import SHARDS_PER_WORKER, shard_bounds
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+# The PDF header may be preceded by up to 1024 bytes of garbage.
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Page payloads that FormatterMD never reads; lean mode drops them unvalidated.
+LEAN_EXCLUDED_FIELDS = ('graphics', 'words')
+
+
+def _validate_chunks(result, lean: bool = False, keep_words: bool = False) -> List[PDFResult]:
+    items = result if isinstance(result, list) else [result]
+    if lean:
+        # Words that were asked for are kept.
+        excluded = [field for field in LEAN_EXCLUDED_FIELDS if not (keep_words and field == 'words')]
+        items = [{key: value for key, value in item.items() if key not in excluded} for item in items]
+    return [PDFResult.model_validate(item) for item in items]
+
+
+def _to_markdown(source, page_chunks: bool, process_images: bool, image_store: Optional[ImageStore] = None, lean: bool = False, image_cache: Optional[Dict[int, Optional[Tuple[str, str]]]] = None, **kwargs) -> List[PDFResult]:
+    if image_store is None:
+        result = pymupdf4llm.to_markdown(
+            source,
+            page_chunks=page_chunks,
+            embed_images=process_images,
+            **kwargs)
+        return _validate_chunks(result, lean, kwargs.get('extract_words', False))
+
+    # pymupdf4llm writes each image once into a staging directory; the store
+    # then takes it over under its content hash, with no base64 round trip.
+    # The document is needed to resolve images to their xrefs.
+    doc = source if isinstance(source, pymupdf.Document) else pymupdf.open(source)
+    try:
+        with image_store.staging_dir() as staging_dir:
+            result = pymupdf4llm.to_markdown(
+                doc,
+                page_chunks=page_chunks,
+                write_images=True,
+                image_path=staging_dir,
+                **kwargs)
+            results = _validate_chunks(result, lean, kwargs.get('extract_words', False))
+            for item in results:
+                image_store.store_page_images(item, staging_dir, doc, image_cache)
+    finally:
+        if doc is not source:
+            doc.close()
+    return results
+
+
+def _convert_shard(source: Union[str, bytes], filename: str, pages: List[int], page_chunks: bool, process_images: bool, hdr_info, lean: bool = False, image_store: Optional[ImageStore] = None, markdown_options: Optional[Dict[str, bool]] = None) -> List[PDFResult]:
+    doc = pymupdf.open(stream=source, filetype="pdf") if isinstance(source, bytes) else pymupdf.open(source)
+    with doc:
+        return _to_markdown(
+            doc,
+            page_chunks,
+            process_images,
+            image_store,
+            lean,
+            pages=pages,
+            hdr_info=hdr_info,
+            filename=filename,
+            **(markdown_options or {}))
+
 
 class PDF2MarkDown:
-    def __init__(self, file_path: str, process_images: bool = False):
+    def __init__(self, file_path: PDFSource, process_images: bool = False, workers: int = 1, lean: bool = False, image_store: Optional[ImageStore] = None, extract_words: bool = False):
         self.file_path = file_path
         self.page_chunks = True
         self.process_images = process_images
+        self.workers = workers
+        self.lean = lean
+        self.image_store = image_store
+        # Only passed when set: pymupdf4llm's word extraction has a cost.
+        self.markdown_options = {'extract_words': True} if extract_words else {}
+        self.image_cache = {}
+        self.stream = None
+
+    def _is_stream(self) -> bool:
+        return not isinstance(self.file_path, (str, os.PathLike))
+
+    def _source_name(self) -> str:
+        if not self._is_stream():
+            return str(self.file_path)
+        name = getattr(self.file_path, "name", None)
+        return name if isinstance(name, str) else ""
+
+    def _display_name(self) -> str:
+        return self._source_name() or "<in-memory PDF>"
+
+    def _read_stream(self) -> Union[bytes, bytearray, memoryview]:
+        if isinstance(self.file_path, (bytes, bytearray, memoryview)):
+            return self.file_path
+        data = self.file_path.read()
+        if not isinstance(data, (bytes, bytearray)):
+            raise ValueError(f"[CHECK FILE] The file object {self._display_name()} must be opened in binary mode.")
+        return data
 
     def _check_file(self):
         try:
-            logging.info(f"[CHECK FILE] Checking if the file {self.file_path} exists and is a PDF.")
-            file_path = Path(self.file_path)
-            if not file_path.is_file():
-                raise ValueError(f"[CHECK FILE] The file {self.file_path} does not exist.")
-            if file_path.suffix.lower() != '.pdf':
-                raise ValueError(f"[CHECK FILE] The file {self.file_path} is not a PDF file.")
+            if self._is_stream():
+                logging.info(f"[CHECK FILE] Checking if the in-memory document {self._display_name()} is a PDF.")
+                if self.stream is None:
+                    self.stream = self._read_stream()
+                header = bytes(self.stream[:PDF_HEADER_WINDOW])
+            else:
+                logging.info(f"[CHECK FILE] Checking if the file {self.file_path} exists and is a PDF.")
+                file_path = Path(self.file_path)
+                if not file_path.is_file():
+                    raise ValueError(f"[CHECK FILE] The file {self.file_path} does not exist.")
+                with open(file_path, 'rb') as pdf_file:
+                    header = pdf_file.read(PDF_HEADER_WINDOW)
+            if PDF_MAGIC not in header:
+                raise ValueError(f"[CHECK FILE] The file {self._display_name()} is not a PDF file.")
         except ValueError:
             raise
         except Exception as e:
-            raise ValueError(f"[CHECK FILE] Invalid file: {self.file_path} --> {e}")
+            raise ValueError(f"[CHECK FILE] Invalid file: {self._display_name()} --> {e}")
 
-    def convert(self) -> List[PDFResult]:
+    def content_hash(self) -> str:
         try:
-            logging.info(f"[CONVERT] Converting {self.file_path} to Markdown.")
             self._check_file()
-            logging.info(f"[CONVERT] File {self.file_path} is valid. Proceeding with conversion.")
-            result = pymupdf4llm.to_markdown(
-                self.file_path,
-                page_chunks=self.page_chunks,
-                embed_images=self.process_images)
-            
-            if isinstance(result, list):
-                return [PDFResult.model_validate(item) for item in result]
+            digest = hashlib.sha256()
+            if self._is_stream():
+                digest.update(self.stream)
             else:
-                return [PDFResult.model_validate(result)]
+                with open(self.file_path, 'rb') as pdf_file:
+                    for block in iter(lambda: pdf_file.read(HASH_CHUNK_SIZE), b""):
+                        digest.update(block)
+            return digest.hexdigest()
         except Exception as e:
-            raise ValueError(f"[CONVERT] Error converting PDF to Markdown: {e}")
\ No newline at end of file
+            raise ValueError(f"[CONVERT] Error converting PDF to Markdown: {e}")
+
+    def open_document(self) -> pymupdf.Document:
+        self._check_file()
+        if self._is_stream():
+            return pymupdf.open(stream=self.stream, filetype="pdf")
+        return pymupdf.open(self.file_path)
+
+    def convert(self) -> List[PDFResult]:
+        try:
+            logging.info(f"[CONVERT] Converting {self._display_name()} to Markdown.")
+            self._check_file()
+            logging.info(f"[CONVERT] File {self._display_name()} is valid. Proceeding with conversion.")
+            if self.workers > 1:
+                return self._convert_parallel()
+            if self._is_stream():
+                with self.open_document() as doc:
+                    return _to_markdown(doc, self.page_chunks, self.process_images, self.image_store, self.lean, self.image_cache, filename=self._source_name(), **self.markdown_options)
+            return _to_markdown(self.file_path, self.page_chunks, self.process_images, self.image_store, self.lean, self.image_cache, **self.markdown_options)
+        except Exception as e:
+            raise ValueError(f"[CONVERT] Error converting PDF to Markdown: {e}")
+
+    def header_info(self, doc: pymupdf.Document):
+        # Header font sizes are computed once per document so that every page is
+        # converted with the same mapping as a single whole-document call.
+        identify_headers = getattr(pymupdf4llm, "IdentifyHeaders", None)
+        return identify_headers(doc) if identify_headers else None
+
+    def _page_shards(self, page_count: int) -> List[List[int]]:
+        # In-memory documents are copied to every shard, so only one per worker.
+        shards_per_worker = 1 if self._is_stream() else SHARDS_PER_WORKER
+        return [list(range(start, end)) for start, end in shard_bounds(page_count, self.workers, shards_per_worker)]
+
+    def _convert_parallel(self) -> List[PDFResult]:
+        with self.open_document() as doc:
+            page_count = doc.page_count
+            hdr_info = self.header_info(doc)
+
+        source = bytes(self.stream) if self._is_stream() else str(self.file_path)
+        shards = self._page_shards(page_count)
+        logging.info(f"[CONVERT] Converting {page_count} pages of {self._display_name()} in {len(shards)} shards with {self.workers} workers.")
+        results = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            futures = [
+                executor.submit(_convert_shard, source, self._source_name(), pages, self.page_chunks, self.process_images, hdr_info, self.lean, self.image_store, self.markdown_options)
+                for pages in shards
+            ]
+            for future in futures:
+                results.extend(future.result())
+        return results
+
+    def convert_pages(self, doc: pymupdf.Document, pages: List[int], hdr_info=None) -> List[PDFResult]:
+        return _to_markdown(
+            doc,
+            self.page_chunks,
+            self.process_images,
+            self.image_store,
+            self.lean,
+            self.image_cache,
+            pages=pages,
+            hdr_info=hdr_info,
+            filename=self._source_name(),
+            **self.markdown_options)
+
+    def convert_iter(self) -> Iterator[PDFResult]:
+        logging.info(f"[CONVERT] Converting {self._display_name()} to Markdown page by page.")
+        try:
+            doc = self.open_document()
+        except Exception as e:
+            raise ValueError(f"[CONVERT] Error converting PDF to Markdown: {e}")
+
+        with doc:
+            try:
+                hdr_info = self.header_info(doc)
+            except Exception as e:
+                raise ValueError(f"[CONVERT] Error converting PDF to Markdown: {e}")
+            for page_number in range(doc.page_count):
+                try:
+                    page_results = self.convert_pages(doc, [page_number], hdr_info)
+                except Exception as e:
+                    raise ValueError(f"[CONVERT] Error converting page {page_number + 1} of {self._display_name()} to Markdown: {e}")
+                yield from page_results
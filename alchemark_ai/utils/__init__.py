@@ -0,0 +1,4 @@
+from .files import write_atomic
+from .sharding import SHARDS_PER_WORKER, shard_bounds
+
+__all__ = ['SHARDS_PER_WORKER', 'shard_bounds', 'write_atomic']
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes):
+    # Write to a temporary file in the same directory and rename it into place,
+    # so concurrent readers never see a partially written file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
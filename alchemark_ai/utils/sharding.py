@@ -0,0 +1,19 @@
+from typing import List, Tuple
+
+# Each worker gets several contiguous shards so that items with very different
+# costs (scans, dense tables, markup-heavy pages) are balanced across the pool.
+SHARDS_PER_WORKER = 4
+
+
+def shard_bounds(count: int, workers: int, shards_per_worker: int = SHARDS_PER_WORKER) -> List[Tuple[int, int]]:
+    # [start, end) of up to workers x shards_per_worker contiguous shards of
+    # count items, in order, differing in size by at most one.
+    shard_count = max(1, min(count, workers * shards_per_worker))
+    shard_size, remainder = divmod(count, shard_count)
+    bounds = []
+    start = 0
+    for i in range(shard_count):
+        end = start + shard_size + (1 if i < remainder else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
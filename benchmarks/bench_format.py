@@ -0,0 +1,77 @@
+"""
+AlcheMark AI - Parallel page formatting benchmark
+=================================================
+
+Times FormatterMD.format() on a synthetic document, serially and with thread
+and process pools of growing size. Each page carries markup, an inline base64
+image and a paragraph of prose, and page languages are detected, so the run
+covers scanning, image hashing, token counting and language detection.
+
+Usage:
+    python benchmarks/bench_format.py [--pages 400] [--workers 2 4 8] [--repeat 3]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import warmup
+from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.models import PDFResult
+
+PROSE = (
+    "The committee reviewed the annual accounts and the auditor's report, and "
+    "approved the budget for the coming year after a short discussion. "
+) * 12
+
+
+def build_page(number: int) -> PDFResult:
+    payload = base64.b64encode(os.urandom(48 * 1024)).decode()
+    text = (
+        f"## Section {number}\n\n{PROSE}\n\n"
+        + "".join(f"- item {i} with a [link](https://example.com/{number}/{i})\n" for i in range(30))
+        + "\n| Name | Value |\n|------|-------|\n"
+        + "".join(f"| row {i} | {i * number} |\n" for i in range(40))
+        + f"\n![figure](data:image/png;base64,{payload})\n"
+    )
+    return PDFResult(
+        metadata={"format": "PDF 1.7", "file_path": "synthetic.pdf", "page_count": 0, "page": number},
+        toc_items=[], tables=[], images=[], graphics=[], words=[], text=text,
+    )
+
+
+def measure(pages, repeat: int, **options) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        content = [page.model_copy() for page in pages]
+        start = time.perf_counter()
+        FormatterMD(content, page_languages=True, **options).format()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel page formatting")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    warmup()
+    pages = [build_page(number) for number in range(1, args.pages + 1)]
+    serial = measure(pages, args.repeat)
+    print(f"{args.pages} pages, {os.cpu_count()} CPUs")
+    print(f"{'pool':>8} {'workers':>8} {'time (s)':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {1:>8} {serial:>10.3f} {1:>8.2f}")
+    for pool in ("thread", "process"):
+        for workers in args.workers:
+            elapsed = measure(pages, args.repeat, workers=workers, pool=pool)
+            print(f"{pool:>8} {workers:>8} {elapsed:>10.3f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+AlcheMark AI - Lean extraction benchmark
+========================================
+
+Measures what the `words` and `graphics` page payloads cost when PDF2MarkDown
+validates and keeps them, compared with lean mode which drops them.
+
+The page chunks are built from a synthetic, drawing-heavy PDF using PyMuPDF's
+own word and vector-graphics extraction, i.e. the same payloads pymupdf4llm puts
+into `words` (with extract_words=True) and `graphics`.
+
+Usage:
+    python benchmarks/bench_lean.py [--pages 50] [--cells 600] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pymupdf
+from alchemark_ai.pdf2md.pdf2md import _validate_chunks
+
+
+def build_document(pages: int, cells: int) -> pymupdf.Document:
+    doc = pymupdf.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        for cell in range(cells):
+            x = 36 + (cell % 24) * 22
+            y = 48 + (cell // 24) * 30
+            page.draw_rect(pymupdf.Rect(x, y, x + 20, y + 26), color=(0, 0, 0), fill=(0.9, 0.9, 0.9))
+            page.insert_text((x + 2, y + 14), f"{page_number}.{cell}", fontsize=5)
+    return doc
+
+
+def build_chunks(doc: pymupdf.Document):
+    chunks = []
+    for page in doc:
+        chunks.append({
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": "synthetic.pdf",
+                "page_count": doc.page_count,
+                "page": page.number + 1
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": page.get_drawings(),
+            "text": page.get_text(),
+            "words": page.get_text("words"),
+        })
+    return chunks
+
+
+def measure(chunks, lean: bool, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _validate_chunks(chunks, lean)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    results = _validate_chunks(chunks, lean)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return best, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lean extraction mode")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--cells", type=int, default=600, help="boxed words drawn per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = build_chunks(build_document(args.pages, args.cells))
+    words = sum(len(chunk["words"]) for chunk in chunks)
+    graphics = sum(len(chunk["graphics"]) for chunk in chunks)
+    print(f"{args.pages} pages, {words} words, {graphics} vector graphics")
+    print(f"{'mode':<6} {'validate (s)':>13} {'retained (MiB)':>15} {'peak (MiB)':>11}")
+
+    rows = {}
+    for mode, lean in (("full", False), ("lean", True)):
+        rows[mode] = measure(chunks, lean, args.repeat)
+        seconds, retained, peak = rows[mode]
+        print(f"{mode:<6} {seconds:>13.3f} {retained / 2**20:>15.1f} {peak / 2**20:>11.1f}")
+
+    full, lean = rows["full"], rows["lean"]
+    print(f"\nlean mode: {full[0] / max(lean[0], 1e-9):.1f}x faster validation, "
+          f"{(1 - lean[1] / max(full[1], 1)) * 100:.0f}% less retained memory")
+
+
+if __name__ == "__main__":
+    main()
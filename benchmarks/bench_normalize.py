@@ -0,0 +1,111 @@
+"""
+AlcheMark AI - Text normalization benchmark
+===========================================
+
+Measures what normalize_text saves on the corpus in benchmarks/token_calibration/.
+The corpus holds clean paragraphs, so each prose paragraph is first laid out
+the way PDF extraction returns it: hard-wrapped at a fixed width, with long
+words hyphenated at the line end, trailing spaces and doubled blank lines.
+Tables, code and list items are left as they are.
+
+For every file the exact token counts of the clean, wrapped and normalized
+text are printed, followed by the throughput of normalize_markdown() on the
+whole corpus repeated. PDFs given with --pdf are converted and counted with
+and without normalization as well.
+
+Usage:
+    python benchmarks/bench_normalize.py [--corpus benchmarks/token_calibration] [--width 72] [--repeat 200] [--pdf file.pdf ...]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md
+from alchemark_ai.formatter.formatter_md import TOKENIZER_MODEL
+from alchemark_ai.formatter.normalizer import LIST_ITEM_PATTERN, STANDALONE_PATTERN, normalize_markdown
+from alchemark_ai.formatter.tokenizer import get_encoding
+
+MIN_HYPHENATED_WORD = 8
+
+
+def load_corpus(corpus_dir: str):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.md"))):
+        with open(path, encoding="utf-8") as corpus_file:
+            pages[os.path.basename(path)] = corpus_file.read()
+    return pages
+
+
+def wrap_paragraph(paragraph: str, width: int) -> str:
+    lines, line = [], ""
+    for word in paragraph.split():
+        if line and len(line) + 1 + len(word) > width:
+            room = width - len(line) - 2
+            if len(word) >= MIN_HYPHENATED_WORD and word.isalpha() and room >= 3:
+                lines.append(f"{line} {word[:room]}-")
+                word = word[room:]
+            else:
+                lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    # Extraction leaves trailing spaces on some lines.
+    return "\n".join(line + "  " if i % 3 == 2 else line for i, line in enumerate(lines))
+
+
+def extracted_layout(text: str, width: int) -> str:
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        prose = paragraph.strip() and "```" not in paragraph and not (
+            STANDALONE_PATTERN.match(paragraph) or LIST_ITEM_PATTERN.match(paragraph)
+        )
+        paragraphs.append(wrap_paragraph(paragraph, width) if prose else paragraph)
+    return "\n\n\n".join(paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text normalization")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "token_calibration"))
+    parser.add_argument("--width", type=int, default=72)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--pdf", nargs="*", default=[])
+    args = parser.parse_args()
+
+    encoding = get_encoding(TOKENIZER_MODEL)
+    count = lambda text: len(encoding.encode_ordinary(text))
+    pages = load_corpus(args.corpus)
+    print(f"encoding: {encoding.name} ({TOKENIZER_MODEL}), wrapped at {args.width} columns")
+    print(f"{'file':<24} {'clean':>7} {'wrapped':>8} {'normalized':>11} {'saved':>7}")
+    totals = [0, 0, 0]
+    wrapped_pages = []
+    for name, text in pages.items():
+        wrapped = extracted_layout(text, args.width)
+        wrapped_pages.append(wrapped)
+        counts = (count(text), count(wrapped), count(normalize_markdown(wrapped)))
+        totals = [total + value for total, value in zip(totals, counts)]
+        print(f"{name:<24} {counts[0]:>7} {counts[1]:>8} {counts[2]:>11} {1 - counts[2] / counts[1]:>7.1%}")
+    print(f"{'total':<24} {totals[0]:>7} {totals[1]:>8} {totals[2]:>11} {1 - totals[2] / totals[1]:>7.1%}")
+
+    text = "\n\n".join(wrapped_pages * args.repeat)
+    start = time.perf_counter()
+    normalize_markdown(text)
+    normalize = time.perf_counter() - start
+    start = time.perf_counter()
+    encoding.encode_ordinary(text)
+    exact = time.perf_counter() - start
+    print(f"\n{len(text) / 2**20:.1f} MiB: normalize {normalize:.3f}s ({len(text) / 2**20 / normalize:.0f} MiB/s), exact tokens {exact:.3f}s")
+
+    for path in args.pdf:
+        plain = sum(result.tokens for result in pdf2md(path))
+        normalized = sum(result.tokens for result in pdf2md(path, normalize_text=True))
+        print(f"{os.path.basename(path)}: {plain} -> {normalized} tokens ({1 - normalized / plain:.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
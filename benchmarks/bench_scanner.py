@@ -0,0 +1,103 @@
+"""
+AlcheMark AI - Markdown scanner benchmark
+=========================================
+
+Times the markdown scanner used by FormatterMD against the previous approach
+(one `re.findall` per element type over the whole page):
+
+- markup-heavy pages of growing size, where linear scaling shows as a flat MiB/s
+  column for both;
+- pages with a long run of whitespace-only lines (layout padding), where the old
+  patterns' leading whitespace match restarts at every line and becomes quadratic.
+
+Usage:
+    python benchmarks/bench_scanner.py [--sizes 1 2 4 8] [--blank-lines 2500 5000 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.markdown_scanner import scan_markdown
+
+BLOCK = """## Section {n}
+
+Paragraph {n} with a [reference](https://example.com/{n}) and <https://example.org/{n}>.
+
+- first point
+- second point
+1. step one
+2. step two
+
+| Name | Value |
+|------|-------|
+| row {n} | {n} |
+
+![figure {n}](data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNk+A8AAQUBAScY42YAAAAASUVORK5CYII=)
+
+"""
+
+
+def build_page(mib: float) -> str:
+    blocks = []
+    size = 0
+    while size < mib * 2**20:
+        block = BLOCK.format(n=len(blocks))
+        blocks.append(block)
+        size += len(block)
+    return "".join(blocks)
+
+
+def regex_scan(text: str):
+    # The per-element findall calls FormatterMD made before the scanner.
+    return (
+        re.findall(r'^\s*#{1,6}\s+.+$', text, re.MULTILINE),
+        re.findall(r'^\s*\d+[.)]\s+.+', text, re.MULTILINE),
+        re.findall(r'^\s*[-*+]\s+.+', text, re.MULTILINE),
+        re.findall(r'\[([^\]]+)\]\(([^)]+)\)', text),
+        re.findall(r'<(https?://[^>]+)>', text),
+        re.findall(r'(?:\|[^\n]*\|\n)+(?:\|[-:| ]*\|\n)(?:\|[^\n]*\|\n)+', text, re.MULTILINE),
+        re.findall(r'(?:!\[.*?\]\((data:image\/[^;]+;base64,[^)]+)\)|<img[^>]*src="(data:image\/[^;]+;base64,[^"]+)"[^>]*>)', text, re.MULTILINE),
+    )
+
+
+def measure(function, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown scanner")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8], help="page sizes in MiB")
+    parser.add_argument("--blank-lines", type=int, nargs="+", default=[2500, 5000, 10000], help="whitespace-only lines per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("markup-heavy pages")
+    print(f"{'size (MiB)':>10} {'scanner (s)':>12} {'MiB/s':>8} {'findall (s)':>12} {'MiB/s':>8}")
+    for mib in args.sizes:
+        text = build_page(mib)
+        size = len(text) / 2**20
+        scanner = measure(scan_markdown, text, args.repeat)
+        findall = measure(regex_scan, text, args.repeat)
+        print(f"{size:>10.1f} {scanner:>12.3f} {size / scanner:>8.1f} {findall:>12.3f} {size / findall:>8.1f}")
+
+    print("\npages with a run of whitespace-only lines")
+    print(f"{'lines':>10} {'scanner (s)':>12} {'findall (s)':>12}")
+    for lines in args.blank_lines:
+        text = BLOCK.format(n=0) + " \n" * lines + BLOCK.format(n=1)
+        scanner = measure(scan_markdown, text, args.repeat)
+        findall = measure(regex_scan, text, 1)
+        print(f"{lines:>10} {scanner:>12.4f} {findall:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+AlcheMark AI - Token estimator calibration
+==========================================
+
+Fits the per-character-class weights used by `token_counter="approx"` against
+the exact BPE counts of the formatter's tokenizer, on the corpus in
+benchmarks/token_calibration/ (reports, contracts, papers, tables and code in
+English, and reports in German, French, Spanish, Russian, Chinese and Japanese).
+
+The weights are fitted on paragraphs, minimising the relative error, and the
+error is then reported per paragraph and per page. Paste the printed weights
+into TOKEN_WEIGHTS in alchemark_ai/formatter/token_estimator.py.
+
+Usage:
+    python benchmarks/calibrate_tokens.py [--corpus benchmarks/token_calibration] [--check]
+
+With --check the current TOKEN_WEIGHTS are evaluated instead of fitted.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.formatter_md import TOKENIZER_MODEL
+from alchemark_ai.formatter.token_estimator import TOKEN_WEIGHTS, character_classes, estimate_tokens
+from alchemark_ai.formatter.tokenizer import get_encoding
+
+CLASSES = ("whitespace", "lowercase", "uppercase", "digits", "other ASCII", "2-byte", "3+-byte")
+
+
+def load_corpus(corpus_dir: str):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.md"))):
+        with open(path, encoding="utf-8") as corpus_file:
+            pages[os.path.basename(path)] = corpus_file.read()
+    return pages
+
+
+def solve(matrix, vector):
+    # Gaussian elimination with partial pivoting; one row per character class.
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(size):
+            if row != column and rows[column][column]:
+                factor = rows[row][column] / rows[column][column]
+                rows[row] = [a - factor * b for a, b in zip(rows[row], rows[column])]
+    return [rows[i][size] / rows[i][i] if rows[i][i] else 0.0 for i in range(size)]
+
+
+def fit(samples):
+    # Weighted least squares on (features, tokens) with weights 1 / tokens^2,
+    # i.e. minimising the squared relative error.
+    size = len(CLASSES)
+    normal = [[0.0] * size for _ in range(size)]
+    target = [0.0] * size
+    for features, tokens in samples:
+        weight = 1.0 / tokens ** 2
+        for i in range(size):
+            target[i] += weight * features[i] * tokens
+            for j in range(size):
+                normal[i][j] += weight * features[i] * features[j]
+    return [max(0.0, value) for value in solve(normal, target)]
+
+
+def relative_errors(samples, weights):
+    return [
+        (sum(w * f for w, f in zip(weights, features)) - tokens) / tokens
+        for features, tokens in samples
+    ]
+
+
+def summarise(label, errors):
+    absolute = sorted(abs(error) for error in errors)
+    p95 = absolute[min(len(absolute) - 1, int(0.95 * len(absolute)))]
+    print(f"{label:<12} n={len(errors):<4} mean |err| {sum(absolute) / len(absolute):6.1%}   "
+          f"p95 |err| {p95:6.1%}   max |err| {absolute[-1]:6.1%}   bias {sum(errors) / len(errors):+6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the approximate token counter")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "token_calibration"))
+    parser.add_argument("--check", action="store_true", help="evaluate the current weights instead of fitting")
+    args = parser.parse_args()
+
+    encoding = get_encoding(TOKENIZER_MODEL)
+    pages = load_corpus(args.corpus)
+    paragraphs = [
+        paragraph for text in pages.values() for paragraph in text.split("\n\n")
+        if len(paragraph.strip()) >= 40
+    ]
+    paragraph_samples = [(character_classes(p), len(encoding.encode_ordinary(p))) for p in paragraphs]
+    page_samples = {name: (character_classes(text), len(encoding.encode_ordinary(text))) for name, text in pages.items()}
+
+    weights = list(TOKEN_WEIGHTS) if args.check else fit(paragraph_samples)
+    print(f"encoding: {encoding.name} ({TOKENIZER_MODEL})")
+    print("TOKEN_WEIGHTS = (" + ", ".join(f"{weight:.4f}" for weight in weights) + ")")
+    print("  " + ", ".join(f"{name}={weight:.3f}" for name, weight in zip(CLASSES, weights)))
+    print()
+    summarise("paragraphs", relative_errors(paragraph_samples, weights))
+    summarise("pages", relative_errors(list(page_samples.values()), weights))
+    print()
+    for name, error in zip(page_samples, relative_errors(list(page_samples.values()), weights)):
+        print(f"  {name:<24} {error:+6.1%}")
+
+    text = "\n\n".join(pages.values()) * 200
+    start = time.perf_counter()
+    estimate_tokens(text)
+    approx = time.perf_counter() - start
+    start = time.perf_counter()
+    encoding.encode_ordinary(text)
+    exact = time.perf_counter() - start
+    print(f"\n{len(text) / 2**20:.1f} MiB: approx {approx:.3f}s ({len(text) / 2**20 / approx:.0f} MiB/s), exact {exact:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
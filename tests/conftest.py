@@ -13,4 +13,52 @@ def invalid_pdf_path():
 def non_pdf_file_path(tmp_path):
     file_path = tmp_path / "test_file.txt"
     file_path.write_text("This is not a PDF file")
-    return str(file_path) 
\ No newline at end of file
+    return str(file_path)
+
+@pytest.fixture
+def make_page():
+    # make_page(number, text, tables=0, words=(), images=()) -> PDFResult
+    from alchemark_ai.models import PDFResult
+
+    def make(number, text, tables=0, words=(), images=()):
+        return PDFResult(
+            metadata={"format": "PDF 1.7", "file_path": "/path/to/sample.pdf", "page_count": 4, "page": number},
+            toc_items=[],
+            tables=[{"bbox": [0, 0, 100, 100], "rows": 3, "columns": 2} for _ in range(tables)],
+            images=list(images),
+            graphics=[],
+            words=list(words),
+            text=text
+        )
+    return make
+
+@pytest.fixture
+def make_page_chunk():
+    # make_page_chunk(file_path, page, page_count, text="Sample text") -> page chunk
+    # as returned by pymupdf4llm.to_markdown(page_chunks=True)
+    def make(file_path, page, page_count, text="Sample text"):
+        return {
+            "metadata": {
+                "format": "PDF 1.7",
+                "title": "Sample",
+                "author": "Author",
+                "subject": "",
+                "keywords": "",
+                "creator": "Creator",
+                "producer": "Producer",
+                "creationDate": "2023-01-01",
+                "modDate": "2023-01-01",
+                "trapped": "",
+                "encryption": None,
+                "file_path": str(file_path),
+                "page_count": page_count,
+                "page": page
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": [],
+            "text": text,
+            "words": []
+        }
+    return make
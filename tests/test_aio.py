@@ -0,0 +1,181 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md_async, pdf2md_async_iter
+from alchemark_ai.formatter.token_estimator import estimate_tokens
+from alchemark_ai.models import FormattedResult
+
+
+@pytest.fixture
+def page_count(sample_pdf_path):
+    import pymupdf
+    with pymupdf.open(sample_pdf_path) as doc:
+        return doc.page_count
+
+
+@pytest.fixture
+def mock_to_markdown(monkeypatch, make_page_chunk):
+    calls = {"threads": set(), "pages": []}
+
+    def to_markdown(doc, **kwargs):
+        calls["threads"].add(threading.get_ident())
+        pages = kwargs.get('pages')
+        if pages is None:
+            return [make_page_chunk(doc, 1, 1, "# Page 1\n\nSample text.")]
+        calls["pages"].extend(pages)
+        return [make_page_chunk(doc.name, page + 1, doc.page_count, f"# Page {page + 1}\n\nSample text.") for page in pages]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: None, raising=False)
+    return calls
+
+
+def test_pdf2md_async(sample_pdf_path, mock_to_markdown):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = asyncio.run(pdf2md_async(sample_pdf_path, executor=executor))
+
+    assert len(results) == 1
+    assert isinstance(results[0], FormattedResult)
+    assert results[0].text.startswith("# Page 1")
+    assert threading.get_ident() not in mock_to_markdown["threads"]
+
+
+def test_pdf2md_async_semaphore_limits_documents(sample_pdf_path, monkeypatch, make_page_chunk):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def to_markdown(file_path, **kwargs):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return [make_page_chunk(file_path, 1, 1)]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+
+    async def convert_all():
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(*[pdf2md_async(sample_pdf_path, executor=executor, semaphore=semaphore) for _ in range(6)])
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = asyncio.run(convert_all())
+
+    assert len(results) == 6
+    assert peak == 2
+
+
+def test_pdf2md_async_cancellation_holds_semaphore(sample_pdf_path, monkeypatch, make_page_chunk):
+    started = threading.Event()
+    finished = threading.Event()
+
+    def slow_to_markdown(file_path, **kwargs):
+        started.set()
+        time.sleep(0.2)
+        finished.set()
+        return [make_page_chunk(file_path, 1, 1)]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", slow_to_markdown)
+
+    async def cancel_during_conversion(semaphore):
+        task = asyncio.create_task(pdf2md_async(sample_pdf_path, semaphore=semaphore))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        held = semaphore.locked()
+        # The slot comes back once the conversion in the executor is done.
+        await asyncio.wait_for(semaphore.acquire(), timeout=5)
+        return held, finished.is_set()
+
+    assert asyncio.run(cancel_during_conversion(asyncio.Semaphore(1))) == (True, True)
+
+
+def test_pdf2md_async_passes_options(sample_pdf_path, mock_to_markdown, tmp_path):
+    from alchemark_ai import ResultCache
+
+    async def convert():
+        cache = ResultCache(tmp_path)
+        results = await pdf2md_async(sample_pdf_path, token_counter="approx", encodings=["cl100k_base"], cache=cache, lean=True)
+        pages = [page async for page in pdf2md_async_iter(sample_pdf_path, encodings=["cl100k_base"], lean=True)]
+        return results, pages, cache.size()
+
+    results, pages, cache_size = asyncio.run(convert())
+
+    assert results[0].tokens == estimate_tokens(results[0].text)
+    assert set(results[0].tokens_by_encoding) == {"cl100k_base"}
+    assert cache_size > 0
+    assert set(pages[0].tokens_by_encoding) == {"cl100k_base"}
+
+
+def test_pdf2md_async_error(invalid_pdf_path):
+    with pytest.raises(ValueError) as excinfo:
+        asyncio.run(pdf2md_async(invalid_pdf_path))
+
+    assert "Error converting PDF to Markdown" in str(excinfo.value)
+
+
+def test_pdf2md_async_iter(sample_pdf_path, page_count, mock_to_markdown):
+    async def collect():
+        return [page async for page in pdf2md_async_iter(sample_pdf_path)]
+
+    results = asyncio.run(collect())
+
+    assert [result.metadata.page for result in results] == list(range(1, page_count + 1))
+
+
+def test_pdf2md_async_iter_early_exit_releases_semaphore(sample_pdf_path, page_count, mock_to_markdown):
+    async def first_page_then_convert_again(semaphore):
+        async for page in pdf2md_async_iter(sample_pdf_path, semaphore=semaphore):
+            break
+        # The slot must be free again, otherwise this would wait forever.
+        results = await asyncio.wait_for(pdf2md_async(sample_pdf_path, semaphore=semaphore), timeout=5)
+        return page, results
+
+    page, results = asyncio.run(first_page_then_convert_again(asyncio.Semaphore(1)))
+
+    assert page.metadata.page == 1
+    assert len(results) == 1
+    assert mock_to_markdown["pages"] == [0]
+
+
+def test_pdf2md_async_iter_cancellation(sample_pdf_path, page_count, monkeypatch, make_page_chunk):
+    started = threading.Event()
+    finished = threading.Event()
+
+    def slow_to_markdown(doc, **kwargs):
+        started.set()
+        time.sleep(0.2)
+        finished.set()
+        return [make_page_chunk(doc.name, page + 1, doc.page_count) for page in kwargs['pages']]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", slow_to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: None, raising=False)
+
+    async def cancel_during_iteration(semaphore):
+        async def consume():
+            return [page async for page in pdf2md_async_iter(sample_pdf_path, semaphore=semaphore)]
+
+        task = asyncio.create_task(consume())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        held = semaphore.locked()
+        # The slot comes back once the page being converted is done.
+        await asyncio.wait_for(semaphore.acquire(), timeout=5)
+        return held, finished.is_set()
+
+    assert asyncio.run(cancel_during_iteration(asyncio.Semaphore(1))) == (True, True)
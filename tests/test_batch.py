@@ -0,0 +1,112 @@
+import os
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md_batch
+from alchemark_ai.batch.batch import BatchConverter
+from alchemark_ai.models import BatchResult, FormattedResult
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    monkeypatch.setattr("alchemark_ai.batch.batch.ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+@pytest.fixture
+def mock_to_markdown(monkeypatch):
+    def to_markdown(file_path, **kwargs):
+        return [{
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": str(file_path),
+                "page_count": 1,
+                "page": 1
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": [],
+            "text": f"# {os.path.basename(str(file_path))}\n\nSample text.",
+            "words": []
+        }]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"doc_{i}.pdf"
+        path.write_bytes(b"%PDF-1.7\n")
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_converts_every_document(thread_pool, mock_to_markdown, pdf_paths):
+    results = list(pdf2md_batch(pdf_paths, workers=2))
+
+    assert sorted(result.file_path for result in results) == sorted(pdf_paths)
+    for result in results:
+        assert isinstance(result, BatchResult)
+        assert result.error is None
+        assert len(result.results) == 1
+        assert isinstance(result.results[0], FormattedResult)
+        assert result.results[0].text.startswith(f"# {os.path.basename(result.file_path)}")
+
+
+def test_batch_reports_failures_without_aborting(thread_pool, mock_to_markdown, pdf_paths, invalid_pdf_path):
+    results = list(pdf2md_batch(pdf_paths[:2] + [invalid_pdf_path] + pdf_paths[2:], workers=2, chunksize=2))
+
+    assert len(results) == len(pdf_paths) + 1
+    failed = [result for result in results if result.error]
+    assert len(failed) == 1
+    assert failed[0].file_path == invalid_pdf_path
+    assert "does not exist" in failed[0].error
+    assert failed[0].results == []
+
+
+def test_batch_chunks(pdf_paths):
+    batch_converter = BatchConverter(pdf_paths, workers=1, chunksize=2)
+
+    assert list(batch_converter._chunks()) == [pdf_paths[0:2], pdf_paths[2:4], pdf_paths[4:5]]
+
+
+def test_batch_backpressure(thread_pool, mock_to_markdown, pdf_paths):
+    consumed_paths = []
+
+    def paths():
+        for path in pdf_paths:
+            consumed_paths.append(path)
+            yield path
+
+    results = BatchConverter(paths(), workers=1, max_pending=2).convert_iter()
+
+    next(results)
+    # Only max_pending chunks are pulled until the caller asks for more.
+    assert len(consumed_paths) == 2
+    next(results)
+    assert len(consumed_paths) == 3
+    assert len(list(results)) == len(pdf_paths) - 2
+
+
+def test_batch_worker_failure(thread_pool, monkeypatch, pdf_paths):
+    def crash(file_paths, options):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr("alchemark_ai.batch.batch._convert_documents", crash)
+
+    results = list(pdf2md_batch(pdf_paths[:2], workers=1))
+
+    assert sorted(result.file_path for result in results) == pdf_paths[:2]
+    assert all("worker died" in result.error for result in results)
+
+
+def test_batch_invalid_params(pdf_paths):
+    with pytest.raises(ValueError) as excinfo:
+        list(pdf2md_batch(pdf_paths, workers=1, chunksize=0))
+
+    assert "chunksize must be a positive integer" in str(excinfo.value)
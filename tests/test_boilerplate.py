@@ -0,0 +1,115 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.boilerplate import normalize_line, strip_boilerplate
+from alchemark_ai.formatter.formatter_md import FormatterMD
+
+BODY = "The committee reviewed the accounts of the year."
+SENTENCES = [
+    "The board met in March.",
+    "Rents rose sharply in spring.",
+    "Travel costs were cut by half.",
+    "The auditors signed off without remarks.",
+]
+
+
+def _words(text, y0, block=0):
+    return [(72.0 + i * 40, y0, 100.0 + i * 40, y0 + 10, word, block, 0, i) for i, word in enumerate(text.split())]
+
+
+def test_normalize_line():
+    assert normalize_line("**Page 3 of 12**") == normalize_line("Page 4  of 12") == "page # of #"
+    assert normalize_line("ACME  Annual Report") == "acme annual report"
+
+
+def test_strip_running_header_and_page_numbers(make_page):
+    pages = [
+        make_page(number, f"ACME Annual Report\n\n{BODY} Section {number}.\n\nPage {number} of 4\n")
+        for number in range(1, 5)
+    ]
+
+    removed = strip_boilerplate(pages)
+
+    assert [page.text for page in pages] == [f"{BODY} Section {number}.\n\n" for number in range(1, 5)]
+    assert removed == [f"ACME Annual Report\nPage {number} of 4\n" for number in range(1, 5)]
+
+
+def test_strip_keeps_lines_on_few_pages(make_page):
+    texts = ["Draft\n\n" + BODY, "Draft\n\n" + BODY + " Again.", "Final text.\n\n" + BODY + " More.", "Other.\n\n" + BODY + " End."]
+    pages = [make_page(number, text) for number, text in enumerate(texts, 1)]
+
+    assert strip_boilerplate(pages[:2]) == ["", ""]
+    assert strip_boilerplate(pages) == ["", "", "", ""]
+    assert [page.text for page in pages] == texts
+
+
+def test_strip_keeps_headings_tables_and_numbered_body_lines(make_page):
+    texts = [
+        f"# Chapter {number}\n\n| Item | Amount |\n|---|---|\n| Rent | {number} |\n\nThis is line 1 of page {number}, some sample text for the test."
+        for number in range(1, 5)
+    ]
+    pages = [make_page(number, text) for number, text in enumerate(texts, 1)]
+
+    assert strip_boilerplate(pages) == ["", "", "", ""]
+    assert [page.text for page in pages] == texts
+
+
+def test_strip_never_empties_a_page(make_page):
+    pages = [make_page(number, f"Confidential\n\n{SENTENCES[number]}") for number in range(1, 4)] + [make_page(4, "Confidential")]
+
+    removed = strip_boilerplate(pages)
+
+    assert removed == ["Confidential\n"] * 3 + [""]
+    assert pages[3].text == "Confidential"
+
+
+def test_strip_uses_word_positions(make_page):
+    # The footer sits at the same height on every page; the repeated phrase
+    # moves around with the body text.
+    pages = [
+        make_page(
+            number,
+            f"{SENTENCES[number - 1]}\n\nSee the notes.\n\nConfidential - ACME Corp",
+            words=_words(SENTENCES[number - 1], 72.0, 0) + _words("See the notes.", 100.0 + number * 30, 1) + _words("Confidential - ACME Corp", 790.0 + number % 2, 2)
+        )
+        for number in range(1, 5)
+    ]
+
+    removed = strip_boilerplate(pages)
+
+    assert removed == ["Confidential - ACME Corp"] * 4
+    assert [page.text for page in pages] == [f"{sentence}\n\nSee the notes.\n\n" for sentence in SENTENCES]
+
+
+def test_format_reports_removed_tokens(make_page):
+    texts = [f"ACME Annual Report\n\n{BODY} Section {number}.\n\nPage {number} of 4" for number in range(1, 5)]
+
+    plain = FormatterMD([make_page(number, text) for number, text in enumerate(texts, 1)]).format()
+    stripped = FormatterMD([make_page(number, text) for number, text in enumerate(texts, 1)], strip_boilerplate=True).format()
+
+    for before, after in zip(plain, stripped):
+        assert "ACME" not in after.text
+        assert after.boilerplate_tokens > 0
+        assert after.tokens < before.tokens
+        assert before.boilerplate_tokens == 0
+
+
+def test_format_iter_rejects_strip_boilerplate(make_page):
+    with pytest.raises(ValueError, match="strip_boilerplate"):
+        list(FormatterMD([make_page(1, BODY)], strip_boilerplate=True).format_iter())
+
+
+def test_pdf2md_strips_sample_footer(sample_pdf_path):
+    from alchemark_ai import pdf2md
+
+    plain = pdf2md(sample_pdf_path)
+    stripped = pdf2md(sample_pdf_path, strip_boilerplate=True, lean=True)
+
+    assert all("Confidential - ACME Corp" in result.text for result in plain)
+    for before, after in zip(plain, stripped):
+        assert "Confidential - ACME Corp" not in after.text
+        assert after.text.startswith(before.text[:20])
+        assert after.boilerplate_tokens > 0
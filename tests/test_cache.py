@@ -0,0 +1,263 @@
+import os
+import pickle
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md
+from alchemark_ai.cache.result_cache import ResultCache
+from alchemark_ai.cache.page_memo import PageMemo
+from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.formatter import language
+from alchemark_ai.models import FormattedResult, FormattedMetadata, FormattedElements
+
+
+def _formatted_result(text="Sample text", page=1):
+    return FormattedResult(
+        metadata=FormattedMetadata(
+            file_path="/path/to/sample.pdf",
+            page=page,
+            page_count=1,
+            text_length=len(text)
+        ),
+        elements=FormattedElements(),
+        text=text,
+        tokens=2,
+        language="en"
+    )
+
+
+@pytest.fixture
+def mock_to_markdown(monkeypatch):
+    calls = []
+
+    def to_markdown(file_path, **kwargs):
+        calls.append(file_path)
+        return [{
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": str(file_path),
+                "page_count": 1,
+                "page": 1
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": [],
+            "text": "# Sample Document\n\nSample text.",
+            "words": []
+        }]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+    return calls
+
+
+def test_cache_put_get(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = cache.key("abc", {"process_images": False})
+
+    assert cache.get(key) is None
+
+    cache.put(key, [_formatted_result()])
+    results = cache.get(key)
+
+    assert len(results) == 1
+    assert isinstance(results[0], FormattedResult)
+    assert results[0].text == "Sample text"
+    assert not [path for path in tmp_path.rglob("*.tmp")]
+
+
+def test_cache_key_depends_on_content_and_options():
+    key = ResultCache.key("abc", {"process_images": False, "keep_images_inline": False})
+
+    assert key == ResultCache.key("abc", {"keep_images_inline": False, "process_images": False})
+    assert key != ResultCache.key("abd", {"process_images": False, "keep_images_inline": False})
+    assert key != ResultCache.key("abc", {"process_images": True, "keep_images_inline": False})
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path)
+    keys = [cache.key(str(i), {}) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, [_formatted_result("x" * 100)])
+        os.utime(cache._entry_path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+    entry_size = cache._entry_path(keys[0]).stat().st_size
+    cache.max_size = entry_size * 3 + entry_size // 2
+
+    # Reading the oldest entry makes it the most recently used one.
+    assert cache.get(keys[0]) is not None
+    cache.put(cache.key("3", {}), [_formatted_result("x" * 100)])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.size() <= cache.max_size
+
+
+def test_cache_scans_directory_only_when_needed(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(20):
+        cache.put(cache.key(str(i), {}), [_formatted_result("x" * 100)])
+    assert len(scans) == 1
+
+    cache.max_size = cache.size() // 2
+    cache.put(cache.key("20", {}), [_formatted_result("x" * 100)])
+    assert cache.size() <= cache.max_size * 0.9 + 1
+    scans.clear()
+    cache.put(cache.key("21", {}), [_formatted_result("x" * 100)])
+    assert scans == []
+
+
+def test_cache_corrupt_entry(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = cache.key("abc", {})
+    cache.put(key, [_formatted_result()])
+    cache._entry_path(key).write_text("{not json")
+
+    assert cache.get(key) is None
+    assert not cache._entry_path(key).exists()
+
+
+def test_cache_clear(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put(cache.key("abc", {}), [_formatted_result()])
+
+    cache.clear()
+
+    assert cache.size() == 0
+
+
+def test_pdf2md_uses_cache(tmp_path, sample_pdf_path, mock_to_markdown):
+    cache = ResultCache(tmp_path / "cache")
+
+    first = pdf2md(sample_pdf_path, cache=cache)
+    second = pdf2md(sample_pdf_path, cache=cache)
+
+    assert len(mock_to_markdown) == 1
+    assert [r.model_dump() for r in first] == [r.model_dump() for r in second]
+
+    pdf2md(sample_pdf_path, keep_images_inline=True, cache=cache)
+    assert len(mock_to_markdown) == 2
+
+
+def test_pdf2md_cache_hit_uses_current_source_name(tmp_path, sample_pdf_path, mock_to_markdown):
+    cache = ResultCache(tmp_path / "cache")
+    copy_path = tmp_path / "copy.pdf"
+    with open(sample_pdf_path, 'rb') as pdf_file:
+        copy_path.write_bytes(pdf_file.read())
+
+    pdf2md(sample_pdf_path, cache=cache)
+    results = pdf2md(str(copy_path), cache=cache)
+
+    assert len(mock_to_markdown) == 1
+    assert results[0].metadata.file_path == str(copy_path)
+
+
+def test_pdf2md_cache_invalid_file(tmp_path, invalid_pdf_path):
+    with pytest.raises(ValueError) as excinfo:
+        pdf2md(invalid_pdf_path, cache=ResultCache(tmp_path))
+
+    assert "does not exist" in str(excinfo.value)
+
+
+def test_page_memo_computes_each_text_once():
+    memo = PageMemo()
+    computed = []
+
+    def compute(texts):
+        computed.append(list(texts))
+        return [len(text) for text in texts]
+
+    assert memo.get_many("tokens", ["cover", "body", "cover"], compute) == [5, 4, 5]
+    assert memo.get_many("tokens", ["cover", "other"], compute) == [5, 5]
+    assert memo.get_many("language", ["cover"], compute) == [5]
+
+    assert computed == [["cover", "body"], ["other"], ["cover"]]
+    stats = memo.stats()
+    assert (stats.hits, stats.disk_hits, stats.misses) == (1, 0, 5)
+    assert stats.hit_rate == pytest.approx(1 / 6)
+
+
+def test_page_memo_keeps_none_values():
+    memo = PageMemo()
+    memo.put("language", "12345", None)
+
+    assert memo.get_many("language", ["12345"], lambda texts: pytest.fail("recomputed")) == [None]
+
+
+def test_page_memo_lru_eviction():
+    memo = PageMemo(max_entries=2)
+    memo.put("tokens", "a", 1)
+    memo.put("tokens", "b", 2)
+    memo.get("tokens", "a")
+    memo.put("tokens", "c", 3)
+
+    assert len(memo) == 2
+    assert memo.get("tokens", "a") == 1
+    assert memo.get("tokens", "b") is None
+    assert memo.get("tokens", "c") == 3
+
+    with pytest.raises(ValueError):
+        PageMemo(max_entries=0)
+
+
+def test_page_memo_disk_tier_is_shared(tmp_path):
+    PageMemo(cache_dir=tmp_path).put("tokens", "disclaimer", 42)
+    memo = pickle.loads(pickle.dumps(PageMemo(max_entries=1, cache_dir=tmp_path)))
+
+    assert memo.get("tokens", "disclaimer") == 42
+    assert memo.get("tokens", "disclaimer") == 42
+    assert memo.stats()[:2] == (1, 1)
+
+    memo.clear()
+    assert PageMemo(cache_dir=tmp_path).get("tokens", "disclaimer") is None
+
+
+def test_page_memo_disk_tier_is_bounded(tmp_path):
+    memo = PageMemo(max_entries=1, cache_dir=tmp_path, max_disk_size=10 * 4096)
+
+    for i in range(40):
+        memo.put("tokens", f"page {i}", i)
+
+    files = list(tmp_path.glob("*/*.json"))
+    assert len(files) <= 10
+    assert PageMemo(cache_dir=tmp_path).get("tokens", "page 39") == 39
+    assert pickle.loads(pickle.dumps(memo)).max_disk_size == 10 * 4096
+
+
+def test_page_memo_corrupt_disk_entry(tmp_path):
+    memo = PageMemo(cache_dir=tmp_path)
+    memo.put("tokens", "page", 7)
+    memo._entry_path(memo.key("tokens", "page")).write_text("{not json")
+
+    assert PageMemo(cache_dir=tmp_path).get("tokens", "page") is None
+
+
+def test_formatter_memo_skips_tokenizer_and_detector(monkeypatch, make_page):
+    def page(number):
+        return make_page(number, "This document is confidential and intended solely for the addressee. " * 5)
+
+    memo = PageMemo()
+    first = FormatterMD([page(1), page(2)], encodings=["cl100k_base"], page_languages=True, memo=memo).format()
+    misses = memo.stats().misses
+
+    def fail(*args, **kwargs):
+        raise AssertionError("recomputed a memoized value")
+
+    monkeypatch.setattr(FormatterMD, "encoding", property(fail))
+    monkeypatch.setattr("alchemark_ai.formatter.formatter_md.get_encoding", fail)
+    monkeypatch.setattr(language, "detect_language", fail)
+    second = FormatterMD([page(3), page(4)], encodings=["cl100k_base"], page_languages=True, memo=memo).format()
+
+    assert (second[0].tokens, second[0].tokens_by_encoding, second[0].language) == (
+        first[0].tokens, first[0].tokens_by_encoding, first[0].language
+    )
+    assert first[0].language == "en"
+    assert memo.stats().misses == misses
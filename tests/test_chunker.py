@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.chunker.chunker import ChunkSource, chunk_pages, chunk_sections
+from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.formatter.tokenizer import get_encoding
+
+SENTENCE = "The committee approved the annual budget after a short discussion of the accounts."
+
+
+def _paragraphs(count, sentences=3):
+    return "\n\n".join(" ".join([SENTENCE] * sentences) for _ in range(count))
+
+
+@pytest.fixture
+def encoding():
+    return FormatterMD([]).encoding
+
+
+def _sources(encoding, texts):
+    return [ChunkSource(number, text, encoding.encode_ordinary(text)) for number, text in enumerate(texts, 1)]
+
+
+def test_chunks_respect_budget_and_cover_pages(encoding):
+    texts = [f"# Section {i}\n\n" + _paragraphs(6) for i in range(3)]
+    sources = _sources(encoding, texts)
+
+    chunks = chunk_pages(sources, encoding, max_tokens=120, overlap=0)
+
+    assert all(chunk.tokens <= 120 for chunk in chunks)
+    assert sum(chunk.tokens for chunk in chunks) == sum(len(source.token_ids) for source in sources)
+    for chunk in chunks:
+        assert chunk.text == "\n\n".join(texts[span.page - 1][span.start:span.end] for span in chunk.spans)
+        assert chunk.pages == [span.page for span in chunk.spans]
+    covered = "\n\n".join(chunk.text for chunk in chunks)
+    assert covered.split() == "\n\n".join(texts).split()
+
+
+def test_chunks_end_at_paragraphs_and_before_headings(encoding):
+    text = _paragraphs(2) + "\n\n## Next section\n\n" + _paragraphs(4)
+    sources = _sources(encoding, [text])
+
+    chunks = chunk_pages(sources, encoding, max_tokens=150, overlap=0)
+
+    paragraph = " ".join([SENTENCE] * 3)
+    for chunk in chunks:
+        assert all(block in (paragraph, "## Next section") for block in chunk.text.split("\n\n"))
+    assert chunks[1].text.startswith("## Next section")
+
+
+def test_chunks_overlap_at_block_starts(encoding):
+    sources = _sources(encoding, [_paragraphs(12, sentences=1)])
+
+    chunks = chunk_pages(sources, encoding, max_tokens=60, overlap=20)
+
+    assert len(chunks) > 2
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.spans[0].start < previous.spans[-1].end
+        assert chunk.text.startswith(SENTENCE)
+    assert chunks[-1].spans[-1].end == len(sources[0].text)
+
+
+def test_chunks_split_long_lines(encoding):
+    text = " ".join([SENTENCE] * 40)
+    sources = _sources(encoding, [text])
+
+    chunks = chunk_pages(sources, encoding, max_tokens=50, overlap=10)
+
+    assert all(chunk.tokens <= 50 for chunk in chunks)
+    assert chunks[0].spans[0].start == 0
+    assert chunks[-1].spans[-1].end == len(text)
+
+
+def test_chunk_text_fits_budget_across_page_seams(encoding):
+    # Short pages put several page joins inside each chunk.
+    sources = _sources(encoding, [f"Line {i}." + " word" * (i % 2 + 1) for i in range(80)])
+
+    for max_tokens in (10, 12, 16, 20):
+        for chunk in chunk_pages(sources, encoding, max_tokens=max_tokens, overlap=0):
+            assert len(encoding.encode_ordinary(chunk.text)) <= max_tokens
+
+
+def test_chunk_sections_follow_outline(encoding):
+    texts = [
+        "Cover page\n\n# Introduction\n\n" + _paragraphs(1),
+        "# Methods\n\n" + _paragraphs(1) + "\n\n## Sampling\n\n" + _paragraphs(1),
+        _paragraphs(1),
+        "Appendix text without its heading. " + _paragraphs(1),
+    ]
+    toc = [[[1, "Introduction", 1]], [[1, "Methods", 2], [2, "Sampling", 2]], [], [[1, "Appendix", 4]]]
+    sources = [
+        ChunkSource(number, text, encoding.encode_ordinary(text), items)
+        for number, (text, items) in enumerate(zip(texts, toc), 1)
+    ]
+
+    chunks = chunk_sections(sources, encoding, max_tokens=500, overlap=0)
+
+    assert [(chunk.headings, chunk.pages) for chunk in chunks] == [
+        ([], [1]),
+        (["Introduction"], [1]),
+        (["Methods"], [2]),
+        (["Methods", "Sampling"], [2, 3]),
+        (["Appendix"], [4]),
+    ]
+    assert chunks[0].text == "Cover page"
+    assert chunks[3].text.startswith("## Sampling")
+    assert chunks[4].text.startswith("Appendix text")
+    assert sum(chunk.tokens for chunk in chunks) == sum(len(source.token_ids) for source in sources)
+
+
+def test_chunk_sections_split_long_sections(encoding):
+    text = "# Results\n\n" + _paragraphs(10)
+    sources = [ChunkSource(1, text, encoding.encode_ordinary(text), [[1, "Results", 1]])]
+
+    chunks = chunk_sections(sources, encoding, max_tokens=100, overlap=10)
+
+    assert len(chunks) > 1
+    assert all(chunk.tokens <= 100 for chunk in chunks)
+    assert all(chunk.headings == ["Results"] for chunk in chunks)
+
+
+def test_chunk_sections_without_outline(encoding):
+    sources = _sources(encoding, [_paragraphs(8), _paragraphs(8)])
+
+    assert chunk_sections(sources, encoding, max_tokens=100, overlap=10) == chunk_pages(sources, encoding, max_tokens=100, overlap=10)
+
+
+def test_chunk_options_are_checked(encoding):
+    with pytest.raises(ValueError, match="max_tokens"):
+        chunk_pages([], encoding, max_tokens=0)
+    with pytest.raises(ValueError, match="overlap"):
+        chunk_pages([], encoding, max_tokens=10, overlap=10)
+    assert chunk_pages([], encoding) == []
+
+
+def test_format_chunks_reuses_token_ids(monkeypatch, make_page):
+    encoding = get_encoding("gpt-4o")
+    calls = []
+
+    class RecordingEncoding:
+        def encode_ordinary_batch(self, texts, num_threads):
+            calls.append(len(texts))
+            return encoding.encode_ordinary_batch(texts, num_threads=num_threads)
+
+        def decode_with_offsets(self, tokens):
+            return encoding.decode_with_offsets(tokens)
+
+    monkeypatch.setattr(FormatterMD, "encoding", RecordingEncoding())
+    pages = [make_page(number, f"# Page {number}\n\n" + _paragraphs(5)) for number in (1, 2, 3)]
+    formatter = FormatterMD(pages)
+
+    chunks = formatter.format_chunks(max_tokens=100, overlap=10)
+
+    assert calls == [3]
+    assert {page for chunk in chunks for page in chunk.pages} == {1, 2, 3}
+    assert all(chunk.tokens <= 100 for chunk in chunks)
+
+
+def test_chunk_pages_scales_linearly(encoding):
+    text = _paragraphs(40)
+    small = _sources(encoding, [text] * 50)
+    large = _sources(encoding, [text] * 400)
+
+    start = time.perf_counter()
+    chunk_pages(small, encoding, max_tokens=256, overlap=32)
+    small_time = time.perf_counter() - start
+    start = time.perf_counter()
+    chunk_pages(large, encoding, max_tokens=256, overlap=32)
+    large_time = time.perf_counter() - start
+
+    assert large_time < small_time * 8 * 3
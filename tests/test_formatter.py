@@ -1,11 +1,16 @@
+import base64
+import hashlib
 import pytest
 import sys
 import os
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from alchemark_ai.formatter import language, tokenizer
 from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.formatter.token_estimator import estimate_tokens
 from alchemark_ai.models import PDFResult, FormattedResult, Table, Image
 
 
@@ -236,22 +241,18 @@ def test_count_markdown_elements_empty():
     assert len(elements['links']) == 0
 
 
-def test_count_markdown_elements_error():
+def test_count_markdown_elements_error(monkeypatch):
     formatter = FormatterMD([])
     
-    def mock_findall_error(*args, **kwargs):
+    def mock_scan_error(*args, **kwargs):
         raise Exception("Test exception")
     
-    original_findall = re.findall
-    re.findall = mock_findall_error
+    monkeypatch.setattr(sys.modules[FormatterMD.__module__], "scan_markdown", mock_scan_error)
     
-    try:
-        with pytest.raises(ValueError) as excinfo:
-            formatter._count_markdown_elements("Test text")
-        
-        assert "Error counting markdown elements" in str(excinfo.value)
-    finally:
-        re.findall = original_findall
+    with pytest.raises(ValueError) as excinfo:
+        formatter._count_markdown_elements("Test text")
+    
+    assert "Error counting markdown elements" in str(excinfo.value)
 
 
 def test_format_success(mock_pdf_result, monkeypatch):
@@ -379,6 +380,63 @@ def test_format_with_image_references(mock_pdf_result_with_images, monkeypatch):
     assert result[0].text.count("[IMAGE](") == 2
 
 
+def test_format_gives_each_inline_image_its_own_hash(mock_pdf_result_with_images, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+    extracted = [uri for uri, _ in FormatterMD([])._extract_images(mock_pdf_result_with_images.text)]
+
+    result = FormatterMD([mock_pdf_result_with_images]).format()
+
+    hashes = [image.hash for image in result[0].elements.images]
+    assert hashes == [hashlib.md5(uri.encode()).hexdigest() for uri in extracted]
+    assert hashes[0] != hashes[1]
+    assert result[0].text.index(f"[IMAGE]({hashes[0]})") < result[0].text.index(f"[IMAGE]({hashes[1]})")
+
+
+def test_format_inline_images_as_embedded_by_pymupdf4llm(mock_pdf_result_with_images, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+    # Copied from to_markdown(embed_images=True): the base64 payload ends with a newline.
+    uri = (
+        "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAFQAAABUCAIAAACTCYeWAAAACXBIWXMAABcSAAAXEgFnn9JSAAAAdElEQVR4nO3PMQ0AAAzDsPInvcHoUUsBEOeS2foH8PDw8PDw8PDw8PDw8PDw8PDw8PDw8PDw8MP1D+Dh4eHh4eHh4eHh4eHh4eHh4eHh4eHh4eGH6x/Aw8PDw8PDw8PDw8PDw8PDw8PDw8PDw8PDD9c/gO/0o692Bovh4D8AAAAASUVORK5CYII="
+    )
+    page = mock_pdf_result_with_images.model_copy(update={
+        "images": mock_pdf_result_with_images.images[:1],
+        "text": f"Red square\n\n\n\n![]({uri}\n)\n"
+    })
+
+    result = FormatterMD([page]).format()
+
+    image = result[0].elements.images[0]
+    assert image.hash == hashlib.md5(uri.encode()).hexdigest()
+    assert image.base64 == uri.split("=")[0] + "="
+    assert result[0].text == f"Red square\n\n\n\n[IMAGE]({image.hash})\n"
+    assert result[0].tokens < len(uri) // 10
+
+
+def test_format_many_inline_images_is_fast(mock_pdf_result_with_images, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+    image_count = 400
+    payloads = [base64.b64encode(i.to_bytes(4, "big") * 4096).decode() for i in range(image_count)]
+    page = mock_pdf_result_with_images.model_copy(update={
+        "images": [
+            Image(number=i, bbox={"x0": 0, "y0": 0, "x1": 10, "y1": 10}, width=10, height=10)
+            for i in range(image_count)
+        ],
+        "text": "# Gallery\n\n" + "\n\nCaption.\n\n".join(
+            f"![Image {i}](data:image/png;base64,{payload})" for i, payload in enumerate(payloads)
+        ) + "\n"
+    })
+
+    start = time.perf_counter()
+    result = FormatterMD([page]).format()
+    elapsed = time.perf_counter() - start
+
+    hashes = [image.hash for image in result[0].elements.images]
+    assert len(set(hashes)) == image_count
+    assert "base64" not in result[0].text
+    assert result[0].text.count("[IMAGE](") == image_count
+    assert elapsed < 5
+
+
 def test_extract_images(mock_pdf_result_with_images):
     formatter = FormatterMD([mock_pdf_result_with_images])
     
@@ -398,4 +456,270 @@ def test_format_error_with_images():
     with pytest.raises(ValueError) as excinfo:
         formatter._extract_images(123)  # Passing non-string should raise error
     
-    assert "Error extracting images from text" in str(excinfo.value)
\ No newline at end of file
+    assert "Error extracting images from text" in str(excinfo.value)
+
+def test_format_iter_from_generator(mock_pdf_result, mock_pdf_result_with_table):
+    formatter = FormatterMD(item for item in [mock_pdf_result, mock_pdf_result_with_table])
+
+    results = formatter.format_iter()
+
+    first = next(results)
+    assert isinstance(first, FormattedResult)
+    assert first.metadata.file_path == "/path/to/sample.pdf"
+
+    rest = list(results)
+    assert len(rest) == 1
+    assert rest[0].metadata.file_path == "/path/to/sample_table.pdf"
+    assert len(rest[0].elements.tables) == 1
+
+
+def test_format_iter_matches_format(mock_pdf_result_with_table):
+    streamed = list(FormatterMD([mock_pdf_result_with_table.model_copy()]).format_iter())
+    formatted = FormatterMD([mock_pdf_result_with_table.model_copy()]).format()
+
+    assert [r.model_dump(exclude={'metadata': {'processed_timestamp'}}) for r in streamed] == \
+        [r.model_dump(exclude={'metadata': {'processed_timestamp'}}) for r in formatted]
+
+
+def test_format_iter_empty_content():
+    with pytest.raises(ValueError) as excinfo:
+        list(FormatterMD(iter([])).format_iter())
+
+    assert "Content is empty" in str(excinfo.value)
+
+
+def test_format_iter_empty_text(mock_pdf_result, mock_pdf_result_empty_text):
+    results = FormatterMD(iter([mock_pdf_result, mock_pdf_result_empty_text])).format_iter()
+
+    assert isinstance(next(results), FormattedResult)
+    with pytest.raises(ValueError) as excinfo:
+        next(results)
+
+    assert "Content text is empty" in str(excinfo.value)
+
+
+def test_tokenizer_registry_loads_once(monkeypatch):
+    calls = []
+
+    def encoding_for_model(model):
+        calls.append(model)
+        time.sleep(0.01)
+        return object()
+
+    monkeypatch.setattr(tokenizer, "_encodings", {})
+    monkeypatch.setattr(tokenizer.tiktoken, "encoding_for_model", encoding_for_model)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        encodings = list(executor.map(lambda _: tokenizer.get_encoding("gpt-4o"), range(16)))
+
+    assert calls == ["gpt-4o"]
+    assert all(encoding is encodings[0] for encoding in encodings)
+
+
+def test_formatters_share_encoding():
+    assert FormatterMD([]).encoding is FormatterMD([]).encoding
+
+
+def test_format_counts_tokens_in_one_batch(mock_pdf_result, mock_pdf_result_with_table, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+    encoding = FormatterMD([]).encoding
+    batches = []
+
+    class RecordingEncoding:
+        def encode_ordinary_batch(self, texts, num_threads):
+            batches.append((len(texts), num_threads))
+            return encoding.encode_ordinary_batch(texts, num_threads=num_threads)
+
+    monkeypatch.setattr(FormatterMD, "encoding", RecordingEncoding())
+    results = FormatterMD([mock_pdf_result, mock_pdf_result_with_table], token_threads=3).format()
+
+    assert batches == [(2, 3)]
+    assert [result.tokens for result in results] == [len(encoding.encode_ordinary(result.text)) for result in results]
+
+
+def test_format_masks_inline_image_payloads(mock_pdf_result_with_images, monkeypatch):
+    detected = []
+
+    def mock_detect(text, max_chars=None):
+        detected.append(text)
+        return "en"
+
+    monkeypatch.setattr(language, "detect_language", mock_detect)
+
+    inline = FormatterMD([mock_pdf_result_with_images.model_copy()], keep_images_inline=True).format()[0]
+    referenced = FormatterMD([mock_pdf_result_with_images.model_copy()], keep_images_inline=False).format()[0]
+
+    assert "data:image/png;base64," in inline.text
+    assert inline.tokens == referenced.tokens
+    assert inline.image_tokens > 0
+    assert referenced.image_tokens == 0
+    assert detected
+    assert all("base64" not in text for text in detected)
+
+
+def test_format_approx_token_counter_skips_tokenizer(mock_pdf_result, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+
+    def no_tokenizer(self):
+        raise AssertionError("the tokenizer must not be loaded")
+
+    monkeypatch.setattr(FormatterMD, "encoding", property(no_tokenizer))
+    result = FormatterMD([mock_pdf_result], token_counter="approx").format()
+
+    assert result[0].tokens == estimate_tokens(result[0].text)
+    assert result[0].tokens > 0
+
+
+def test_estimate_tokens_on_calibration_corpus():
+    corpus_dir = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'token_calibration')
+    encoding = FormatterMD([]).encoding
+    exact = approx = 0
+    for name in sorted(os.listdir(corpus_dir)):
+        with open(os.path.join(corpus_dir, name), encoding="utf-8") as corpus_file:
+            text = corpus_file.read()
+        page_exact = len(encoding.encode_ordinary(text))
+        page_approx = estimate_tokens(text)
+        # The weights are fitted against the default tokenizer's encoding.
+        assert abs(page_approx - page_exact) / page_exact < 0.15, name
+        exact += page_exact
+        approx += page_approx
+
+    assert abs(approx - exact) / exact < 0.05
+    assert estimate_tokens("") == 0
+
+
+def test_invalid_token_counter():
+    with pytest.raises(ValueError) as excinfo:
+        FormatterMD([], token_counter="words")
+
+    assert "token_counter must be one of" in str(excinfo.value)
+
+
+def test_format_tokens_by_encoding(mock_pdf_result, mock_pdf_result_with_table, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+    loaded = []
+    original_get_encoding = tokenizer.tiktoken.get_encoding
+
+    def get_encoding(name):
+        loaded.append(name)
+        return original_get_encoding(name)
+
+    monkeypatch.setattr(tokenizer, "_encodings", {})
+    monkeypatch.setattr(tokenizer.tiktoken, "get_encoding", get_encoding)
+
+    results = FormatterMD([mock_pdf_result, mock_pdf_result_with_table], encodings=["o200k_base", "cl100k_base"]).format()
+    streamed = list(FormatterMD(iter([mock_pdf_result_with_table]), encodings=["o200k_base", "cl100k_base"]).format_iter())
+
+    assert loaded == ["o200k_base", "cl100k_base"]
+    for result in results + streamed:
+        assert set(result.tokens_by_encoding) == {"o200k_base", "cl100k_base"}
+        assert result.tokens_by_encoding["cl100k_base"] == len(original_get_encoding("cl100k_base").encode_ordinary(result.text))
+    assert streamed[0].tokens_by_encoding == results[1].tokens_by_encoding
+
+
+def test_format_without_extra_encodings(mock_pdf_result, monkeypatch):
+    monkeypatch.setattr("langdetect.detect", lambda text: "en")
+
+    assert FormatterMD([mock_pdf_result]).format()[0].tokens_by_encoding == {}
+
+
+ENGLISH_TEXT = (
+    "The quarterly report describes the results of the company and the outlook for the next year. "
+    "Revenue grew in every region, while operating costs remained stable compared with last year. "
+) * 4
+FRENCH_TEXT = (
+    "Le rapport trimestriel présente les résultats de la société et les perspectives pour l'année prochaine. "
+    "Le chiffre d'affaires a augmenté dans toutes les régions, tandis que les coûts sont restés stables. "
+) * 4
+
+
+def test_detect_language_is_reproducible():
+    text = "Hello world, ciao mondo, hola mundo"
+
+    assert len({language.detect_language(text) for _ in range(10)}) == 1
+    assert language.detect_language("   ") is None
+    assert language.detect_language("12345 67890") is None
+
+
+def test_format_reports_document_language_on_every_page(mock_pdf_result):
+    pages = [
+        mock_pdf_result.model_copy(update={"text": ENGLISH_TEXT * 2}),
+        mock_pdf_result.model_copy(update={"text": "Merci beaucoup"}),
+        mock_pdf_result.model_copy(update={"text": FRENCH_TEXT}),
+        mock_pdf_result.model_copy(update={"text": ENGLISH_TEXT}),
+    ]
+
+    results = FormatterMD(pages).format()
+
+    assert [result.language for result in results] == ["en", "en", "en", "en"]
+
+
+def test_format_page_languages_skips_short_pages(mock_pdf_result):
+    pages = [
+        mock_pdf_result.model_copy(update={"text": ENGLISH_TEXT}),
+        mock_pdf_result.model_copy(update={"text": "Merci beaucoup"}),
+        mock_pdf_result.model_copy(update={"text": FRENCH_TEXT}),
+        mock_pdf_result.model_copy(update={"text": ENGLISH_TEXT}),
+    ]
+
+    results = FormatterMD(pages, page_languages=True).format()
+
+    assert [result.language for result in results] == ["en", "en", "fr", "en"]
+
+
+def test_document_language_stops_sampling_once_settled(mock_pdf_result, monkeypatch):
+    samples = []
+    detect = language.detect_language
+
+    def recording_detect(text, max_chars=language.PAGE_LANGUAGE_CHARS):
+        samples.append(len(text))
+        return detect(text, max_chars)
+
+    monkeypatch.setattr(language, "detect_language", recording_detect)
+    pages = [mock_pdf_result.model_copy(update={"text": ENGLISH_TEXT * 10}) for _ in range(20)]
+
+    results = FormatterMD(pages).format()
+
+    assert {result.language for result in results} == {"en"}
+    assert samples == [language.LANGUAGE_SAMPLE_CHARS]
+
+
+GERMAN_COVER = "Jahresbericht 2023\n\nTabelle 1"
+
+
+def test_format_samples_every_page_before_assigning_the_language(mock_pdf_result):
+    texts = [GERMAN_COVER, ENGLISH_TEXT, ENGLISH_TEXT * 2, ENGLISH_TEXT]
+    pages = [mock_pdf_result.model_copy(update={"text": text}) for text in texts]
+
+    assert [result.language for result in FormatterMD(pages).format()] == ["en"] * 4
+
+
+def test_format_iter_detects_language_without_look_ahead(mock_pdf_result):
+    pages = [mock_pdf_result.model_copy(update={"text": text}) for text in ("Danke", FRENCH_TEXT * 2, ENGLISH_TEXT)]
+
+    streamed = [result.language for result in FormatterMD(iter(pages)).format_iter()]
+
+    assert streamed[1:] == ["fr", "fr"]
+    assert [result.language for result in FormatterMD(pages).format()] == ["fr"] * 3
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_format_workers_keep_page_order(mock_pdf_result, mock_pdf_result_with_images, pool):
+    texts = [ENGLISH_TEXT, FRENCH_TEXT, "Short page", ENGLISH_TEXT * 3]
+    pages = [
+        (mock_pdf_result_with_images if i % 2 else mock_pdf_result).model_copy(update={"text": f"# Page {i}\n\n{text}"})
+        for i, text in enumerate(texts * 3)
+    ]
+
+    serial = FormatterMD([page.model_copy() for page in pages], page_languages=True).format()
+    parallel = FormatterMD([page.model_copy() for page in pages], page_languages=True, workers=3, pool=pool).format()
+
+    assert [result.model_dump(exclude={"metadata"}) for result in parallel] == [
+        result.model_dump(exclude={"metadata"}) for result in serial
+    ]
+    assert [result.elements.titles for result in parallel] == [[f"# Page {i}"] for i in range(len(pages))]
+
+
+def test_format_invalid_pool():
+    with pytest.raises(ValueError, match="pool must be one of"):
+        FormatterMD([], pool="fiber")
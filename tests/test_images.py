@@ -0,0 +1,256 @@
+import hashlib
+import os
+import sys
+import pymupdf
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md
+from alchemark_ai.images.image_store import ImageStore, DirectoryImageStore
+
+
+def _png(width, height, color):
+    # A staged render: at 72 dpi its pixel size is the size of its rect.
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, width, height), False)
+    pixmap.set_rect(pixmap.irect, color)
+    pixmap.set_dpi(72, 72)
+    return pixmap.tobytes("png")
+
+
+def _bbox(y, width, height):
+    return {"x0": 0, "y0": y, "x1": width, "y1": y + height}
+
+
+PNG_BYTES = _png(10, 10, (255, 0, 0))
+OTHER_PNG_BYTES = _png(20, 10, (0, 0, 255))
+PAGE_BBOXES = [_bbox(0, 10, 10), _bbox(20, 20, 10), _bbox(40, 10, 10)]
+
+
+class MemoryImageStore(ImageStore):
+    def __init__(self):
+        self.images = {}
+
+    def put(self, key, data, extension):
+        self.images[key] = data
+        return f"mem://{key}.{extension}"
+
+
+def _images(*bboxes):
+    return [{"number": i, "bbox": bbox, "width": 10, "height": 10} for i, bbox in enumerate(bboxes)]
+
+
+@pytest.fixture
+def mock_to_markdown(monkeypatch):
+    def to_markdown(file_path, **kwargs):
+        assert kwargs.get('write_images') is True
+        assert not kwargs.get('embed_images')
+        image_path = kwargs['image_path']
+        references = []
+        for i, data in enumerate([PNG_BYTES, OTHER_PNG_BYTES, PNG_BYTES]):
+            staged = os.path.join(image_path, f"sample.pdf-0-{i}.png")
+            with open(staged, 'wb') as image_file:
+                image_file.write(data)
+            references.append(f"![]({staged})")
+        return [{
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": str(file_path),
+                "page_count": 1,
+                "page": 1
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": _images(*PAGE_BBOXES),
+            "graphics": [],
+            "text": "# Report\n\n" + "\n\nSome text.\n\n".join(references),
+            "words": []
+        }]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+
+
+def test_directory_store_put_is_content_addressed(tmp_path):
+    store = DirectoryImageStore(tmp_path / "images")
+    key = hashlib.sha256(PNG_BYTES).hexdigest()
+
+    reference = store.put(key, PNG_BYTES, "png")
+
+    assert reference == str(tmp_path / "images" / f"{key}.png")
+    assert store.put(key, PNG_BYTES, "png") == reference
+    assert (tmp_path / "images" / f"{key}.png").read_bytes() == PNG_BYTES
+    assert not list((tmp_path / "images").glob("*.tmp"))
+
+
+def test_directory_store_moves_staged_files(tmp_path, make_page):
+    store = DirectoryImageStore(tmp_path / "images")
+
+    with store.staging_dir() as staging_dir:
+        staged = os.path.join(staging_dir, "page-0-0.png")
+        with open(staged, 'wb') as image_file:
+            image_file.write(PNG_BYTES)
+        item = make_page(1, f"Before\n\n![]({staged})\n\nAfter", images=_images(PAGE_BBOXES[0]))
+
+        store.store_page_images(item, staging_dir)
+
+        assert not os.path.exists(staged)
+
+    key = hashlib.sha256(PNG_BYTES).hexdigest()
+    assert item.images[0].hash == key
+    assert item.images[0].path == str(tmp_path / "images" / f"{key}.png")
+    assert item.text == f"Before\n\n![]({item.images[0].path})\n\nAfter"
+    assert [path.name for path in (tmp_path / "images").iterdir()] == [f"{key}.png"]
+
+
+def test_store_page_images_keeps_foreign_references(tmp_path, make_page):
+    store = MemoryImageStore()
+    item = make_page(1, "![logo](https://example.com/logo.png)")
+
+    with store.staging_dir() as staging_dir:
+        store.store_page_images(item, staging_dir)
+
+    assert item.text == "![logo](https://example.com/logo.png)"
+    assert store.images == {}
+
+
+def test_pdf2md_with_image_store_inline(tmp_path, sample_pdf_path, mock_to_markdown):
+    store = DirectoryImageStore(tmp_path / "images")
+
+    results = pdf2md(sample_pdf_path, process_images=True, keep_images_inline=True, image_store=store)
+
+    images = results[0].elements.images
+    assert len(images) == 3
+    assert all(image.base64 is None for image in images)
+    assert images[0].hash == hashlib.sha256(PNG_BYTES).hexdigest()
+    assert images[1].hash == hashlib.sha256(OTHER_PNG_BYTES).hexdigest()
+    assert images[2].path == images[0].path
+    assert f"![]({images[1].path})" in results[0].text
+    assert "base64" not in results[0].text
+    assert len(list((tmp_path / "images").iterdir())) == 2
+
+
+def test_pdf2md_with_image_store_references(sample_pdf_path, mock_to_markdown):
+    store = MemoryImageStore()
+
+    results = pdf2md(sample_pdf_path, process_images=True, image_store=store)
+
+    images = results[0].elements.images
+    assert images[0].path.startswith("mem://")
+    assert results[0].text.count(f"[IMAGE]({images[0].hash})") == 2
+    assert results[0].text.count(f"[IMAGE]({images[1].hash})") == 1
+    assert "mem://" not in results[0].text
+    assert store.images[images[1].hash] == OTHER_PNG_BYTES
+
+
+class FakePage:
+    def get_image_info(self, xrefs=False):
+        return [{"number": 0, "xref": 7}, {"number": 1, "xref": 0}]
+
+
+class FakeDocument:
+    def __init__(self):
+        self.extracted = []
+
+    def __getitem__(self, index):
+        return FakePage()
+
+    def extract_image(self, xref):
+        self.extracted.append(xref)
+        return {"image": PNG_BYTES, "ext": "png"}
+
+
+def test_store_page_images_extracts_each_xref_once(tmp_path, make_page):
+    store = MemoryImageStore()
+    doc = FakeDocument()
+    xref_cache = {}
+    items = []
+
+    with store.staging_dir() as staging_dir:
+        for page in range(3):
+            logo = os.path.join(staging_dir, f"page-{page}-0.png")
+            chart = os.path.join(staging_dir, f"page-{page}-1.png")
+            for staged, data in ((logo, _png(10, 10, (0, 0, 0))), (chart, OTHER_PNG_BYTES)):
+                with open(staged, 'wb') as image_file:
+                    image_file.write(data)
+            item = make_page(1, f"![]({logo})\n\n![]({chart})", images=_images(*PAGE_BBOXES[:2]))
+            store.store_page_images(item, staging_dir, doc, xref_cache)
+            items.append(item)
+            assert not os.path.exists(logo)
+
+    key = hashlib.sha256(PNG_BYTES).hexdigest()
+    assert doc.extracted == [7]
+    assert all(item.images[0].hash == key for item in items)
+    assert all(item.images[1].hash == hashlib.sha256(OTHER_PNG_BYTES).hexdigest() for item in items)
+    assert items[2].text.startswith(f"![](mem://{key}.png)")
+    assert store.images[key] == PNG_BYTES
+    assert len(store.images) == 2
+
+
+def test_store_page_images_matches_renders_by_rect(tmp_path, make_page):
+    # pymupdf4llm lists the chart first, being larger, but renders the logo
+    # above it first, and renders vector graphics in between.
+    store = MemoryImageStore()
+    item = make_page(1, "", images=_images(_bbox(100, 20, 10), _bbox(0, 10, 10)))
+
+    with store.staging_dir() as staging_dir:
+        staged = [os.path.join(staging_dir, f"page-0-{i}.png") for i in range(3)]
+        for path, data in zip(staged, (PNG_BYTES, _png(30, 30, (0, 255, 0)), OTHER_PNG_BYTES)):
+            with open(path, 'wb') as image_file:
+                image_file.write(data)
+        item.text = "\n\n".join(f"![]({path})" for path in staged)
+        store.store_page_images(item, staging_dir)
+
+    logo, graphic, chart = (hashlib.sha256(data).hexdigest() for data in (PNG_BYTES, _png(30, 30, (0, 255, 0)), OTHER_PNG_BYTES))
+    assert [image.hash for image in item.images] == [chart, logo]
+    assert [image.path for image in item.images] == [f"mem://{chart}.png", f"mem://{logo}.png"]
+    assert item.text == f"![](mem://{logo}.png)\n\n![](mem://{graphic}.png)\n\n![](mem://{chart}.png)"
+
+
+def test_directory_store_dedupes_across_documents(tmp_path, sample_pdf_path, mock_to_markdown):
+    store = DirectoryImageStore(tmp_path / "images")
+
+    first = pdf2md(sample_pdf_path, process_images=True, image_store=store)
+    second = pdf2md(sample_pdf_path, process_images=True, image_store=store)
+
+    assert [image.hash for image in first[0].elements.images] == [image.hash for image in second[0].elements.images]
+    assert len(list((tmp_path / "images").iterdir())) == 2
+
+
+def test_image_store_requires_put_and_keys_cache_by_identifier(tmp_path):
+    from alchemark_ai import _conversion_options
+
+    class IncompleteStore(ImageStore):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
+
+    assert _conversion_options(True, False, MemoryImageStore()) == _conversion_options(True, False, MemoryImageStore())
+    first = _conversion_options(True, False, DirectoryImageStore(tmp_path / "a"))
+    assert first == _conversion_options(True, False, DirectoryImageStore(tmp_path / "a"))
+    assert first != _conversion_options(True, False, DirectoryImageStore(tmp_path / "b"))
+
+
+def test_xref_images_keep_their_soft_mask(tmp_path):
+    import pymupdf
+
+    logo = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 40, 40), True)
+    logo.set_alpha(bytes(40 * 40))
+    logo.set_rect(pymupdf.IRect(10, 10, 30, 30), (255, 0, 0, 255))
+    doc = pymupdf.open()
+    for page_number in range(4):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Report page {page_number + 1}")
+        page.insert_image(pymupdf.Rect(100, 100, 300, 300), stream=logo.tobytes("png"))
+    pdf_path = tmp_path / "logo.pdf"
+    doc.save(pdf_path)
+
+    store = DirectoryImageStore(tmp_path / "images")
+    results = pdf2md(str(pdf_path), process_images=True, image_store=store)
+
+    paths = {image.path for result in results for image in result.elements.images}
+    assert len(paths) == 1
+    stored = pymupdf.Pixmap(paths.pop())
+    assert stored.alpha
+    assert stored.pixel(0, 0)[-1] == 0
+    assert stored.pixel(20, 20) == (255, 0, 0, 255)
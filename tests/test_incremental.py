@@ -0,0 +1,135 @@
+import os
+import sys
+import pytest
+import pymupdf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai import pdf2md_incremental
+from alchemark_ai.models import IncrementalResult
+
+
+def _write_pdf(path, page_texts):
+    doc = pymupdf.open()
+    for text in page_texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def converted_pages(monkeypatch):
+    calls = []
+
+    def to_markdown(doc, **kwargs):
+        calls.append(list(kwargs['pages']))
+        return [{
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": kwargs['filename'],
+                "page_count": doc.page_count,
+                "page": page + 1
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": [],
+            "text": doc[page].get_text(),
+            "words": []
+        } for page in kwargs['pages']]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: None, raising=False)
+    return calls
+
+
+def test_incremental_first_run_converts_everything(tmp_path, converted_pages):
+    pdf_path = _write_pdf(tmp_path / "contract.pdf", ["Page one", "Page two", "Page three"])
+    manifest_path = tmp_path / "contract.manifest.json"
+
+    result = pdf2md_incremental(pdf_path, manifest_path)
+
+    assert isinstance(result, IncrementalResult)
+    assert result.changed_pages == [1, 2, 3]
+    assert result.reused_pages == []
+    assert [r.text.strip() for r in result.results] == ["Page one", "Page two", "Page three"]
+    assert manifest_path.exists()
+
+
+def test_incremental_unchanged_document_is_not_converted(tmp_path, converted_pages):
+    pdf_path = _write_pdf(tmp_path / "contract.pdf", ["Page one", "Page two"])
+    manifest_path = tmp_path / "contract.manifest.json"
+
+    first = pdf2md_incremental(pdf_path, manifest_path)
+    second = pdf2md_incremental(pdf_path, manifest_path)
+
+    assert converted_pages == [[0, 1]]
+    assert second.changed_pages == []
+    assert second.reused_pages == [1, 2]
+    assert [r.model_dump() for r in first.results] == [r.model_dump() for r in second.results]
+
+
+def test_incremental_converts_only_changed_pages(tmp_path, converted_pages):
+    manifest_path = tmp_path / "contract.manifest.json"
+    pdf2md_incremental(_write_pdf(tmp_path / "v1.pdf", ["Page one", "Page two", "Page three"]), manifest_path)
+
+    result = pdf2md_incremental(_write_pdf(tmp_path / "v2.pdf", ["Page one", "Page two revised", "Page three"]), manifest_path)
+
+    assert converted_pages[-1] == [1]
+    assert result.changed_pages == [2]
+    assert result.reused_pages == [1, 3]
+    assert result.results[1].text.strip() == "Page two revised"
+    assert all(r.metadata.file_path == str(tmp_path / "v2.pdf") for r in result.results)
+
+
+def test_incremental_reuses_moved_pages(tmp_path, converted_pages):
+    manifest_path = tmp_path / "contract.manifest.json"
+    pdf2md_incremental(_write_pdf(tmp_path / "v1.pdf", ["Page one", "Page two"]), manifest_path)
+
+    result = pdf2md_incremental(_write_pdf(tmp_path / "v2.pdf", ["Cover", "Page one", "Page two"]), manifest_path)
+
+    assert result.changed_pages == [1]
+    assert [r.metadata.page for r in result.results] == [1, 2, 3]
+    assert all(r.metadata.page_count == 3 for r in result.results)
+    assert result.results[2].text.strip() == "Page two"
+
+
+def test_incremental_keeps_the_document_language(tmp_path, converted_pages):
+    english = "\n".join(["The committee reviewed the annual accounts and approved the budget for next year."] * 4)
+    manifest_path = tmp_path / "report.manifest.json"
+    first = pdf2md_incremental(_write_pdf(tmp_path / "v1.pdf", [english, english, english]), manifest_path)
+
+    result = pdf2md_incremental(_write_pdf(tmp_path / "v2.pdf", [english, "Relazione", english]), manifest_path)
+
+    assert [r.language for r in first.results] == ["en", "en", "en"]
+    assert result.changed_pages == [2]
+    assert [r.language for r in result.results] == ["en", "en", "en"]
+
+
+def test_incremental_option_change_converts_everything(tmp_path, converted_pages):
+    pdf_path = _write_pdf(tmp_path / "contract.pdf", ["Page one", "Page two"])
+    manifest_path = tmp_path / "contract.manifest.json"
+    pdf2md_incremental(pdf_path, manifest_path)
+
+    result = pdf2md_incremental(pdf_path, manifest_path, keep_images_inline=True)
+
+    assert result.changed_pages == [1, 2]
+
+
+def test_incremental_corrupt_manifest(tmp_path, converted_pages):
+    pdf_path = _write_pdf(tmp_path / "contract.pdf", ["Page one"])
+    manifest_path = tmp_path / "contract.manifest.json"
+    manifest_path.write_text("{not json")
+
+    result = pdf2md_incremental(pdf_path, manifest_path)
+
+    assert result.changed_pages == [1]
+
+
+def test_incremental_invalid_file(tmp_path, invalid_pdf_path):
+    with pytest.raises(ValueError) as excinfo:
+        pdf2md_incremental(invalid_pdf_path, tmp_path / "manifest.json")
+
+    assert "Error converting PDF incrementally" in str(excinfo.value)
@@ -199,4 +199,69 @@ def test_module_pdf2md_with_images(sample_pdf_path, monkeypatch):
     assert len(formatted_results[0].elements.images) == 1
     assert formatted_results[0].elements.images[0].hash is not None
     assert "data:image/png;base64," not in formatted_results[0].text
-    assert "[IMAGE](" in formatted_results[0].text 
\ No newline at end of file
+    assert "[IMAGE](" in formatted_results[0].text 
+
+def test_module_pdf2md_iter(sample_pdf_path, monkeypatch):
+    from alchemark_ai import pdf2md_iter
+    import pymupdf
+
+    with pymupdf.open(sample_pdf_path) as doc:
+        page_count = doc.page_count
+
+    def mock_to_markdown(doc, **kwargs):
+        page = kwargs['pages'][0] + 1
+        return [{
+            "metadata": {
+                "format": "PDF 1.7",
+                "file_path": sample_pdf_path,
+                "page_count": doc.page_count,
+                "page": page
+            },
+            "toc_items": [],
+            "tables": [],
+            "images": [],
+            "graphics": [],
+            "text": f"# Page {page}\n\n- Item 1\n- Item 2",
+            "words": []
+        }]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", mock_to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: None, raising=False)
+
+    results = pdf2md_iter(sample_pdf_path)
+
+    assert not isinstance(results, list)
+    formatted_results = list(results)
+    assert len(formatted_results) == page_count
+    for page, result in enumerate(formatted_results, start=1):
+        assert isinstance(result, FormattedResult)
+        assert result.metadata.page == page
+        assert result.metadata.page_count == page_count
+        assert result.text.startswith(f"# Page {page}")
+        assert len(result.elements.lists) == 2
+
+
+def test_warmup_preloads_shared_resources(monkeypatch):
+    from alchemark_ai import warmup, TOKENIZER_MODEL
+    from alchemark_ai.formatter import tokenizer
+    import langdetect.detector_factory as detector_factory
+
+    monkeypatch.setattr(tokenizer, "_encodings", {})
+    monkeypatch.setattr(detector_factory, "_factory", None)
+
+    warmup()
+
+    assert TOKENIZER_MODEL in tokenizer._encodings
+    assert detector_factory._factory is not None
+
+
+def test_pdf2md_chunks_integration(sample_pdf_path):
+    from alchemark_ai import pdf2md, pdf2md_chunks
+
+    pages = {result.metadata.page: result.text for result in pdf2md(sample_pdf_path)}
+    chunks = pdf2md_chunks(sample_pdf_path, max_tokens=64, overlap=8)
+
+    assert chunks
+    assert all(chunk.tokens <= 64 for chunk in chunks)
+    for chunk in chunks:
+        assert chunk.text == "\n\n".join(pages[span.page][span.start:span.end] for span in chunk.spans)
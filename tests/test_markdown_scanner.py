@@ -0,0 +1,71 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.markdown_scanner import scan_markdown
+
+MARKDOWN_TEXT = """# Title
+Intro with [a link](https://example.com) and <https://example.org>.
+
+- Item 1
+  * Nested item
+1. First
+2) Second
+
+| Header 1 | Header 2 |
+|----------|----------|
+| [Cell](https://cell.example) | Cell 2 |
+
+![logo](data:image/png;base64,iVBORw0KGgo=)
+<img alt="chart" src="data:image/jpeg;base64,/9j/4AAQ">
+####### Not a title
+-not a list item
+"""
+
+
+def test_scan_markdown_elements():
+    scanned = scan_markdown(MARKDOWN_TEXT)
+
+    assert [title.text for title in scanned.titles] == ["# Title"]
+    assert [item.text for item in scanned.lists] == ["1. First", "2) Second", "- Item 1", "  * Nested item"]
+    assert [(link.text, link.url) for link in scanned.links] == [
+        ("a link", "https://example.com"),
+        ("https://example.org", "https://example.org"),
+        ("Cell", "https://cell.example"),
+    ]
+    assert [(image.alt, image.source, image.html) for image in scanned.images] == [
+        ("logo", "data:image/png;base64,iVBORw0KGgo=", False),
+        ("", "data:image/jpeg;base64,/9j/4AAQ", True),
+    ]
+    assert scanned.tables[0].text == (
+        "| Header 1 | Header 2 |\n|----------|----------|\n| [Cell](https://cell.example) | Cell 2 |\n"
+    )
+
+
+def test_scan_markdown_offsets():
+    scanned = scan_markdown(MARKDOWN_TEXT)
+
+    for span in scanned.titles + scanned.lists + scanned.tables:
+        assert MARKDOWN_TEXT[span.start:span.end] == span.text
+    for link in scanned.links:
+        assert link.url in MARKDOWN_TEXT[link.start:link.end]
+    for image in scanned.images:
+        assert MARKDOWN_TEXT[image.start:image.end].endswith((")", ">"))
+        assert image.source in MARKDOWN_TEXT[image.start:image.end]
+
+
+def test_scan_markdown_table_needs_separator_and_body():
+    no_separator = "| a | b |\n| c | d |\n"
+    no_body = "| a | b |\n|---|---|\n"
+    unterminated = "| a | b |\n|---|---|\n| c | d |"
+
+    assert scan_markdown(no_separator).tables == []
+    assert scan_markdown(no_body).tables == []
+    assert scan_markdown(unterminated).tables == []
+
+
+def test_scan_markdown_empty():
+    scanned = scan_markdown("")
+
+    assert scanned.titles == scanned.lists == scanned.links == scanned.tables == scanned.images == []
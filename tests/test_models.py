@@ -152,6 +152,24 @@ def test_pdf_result_model():
     assert isinstance(pdf_result.words, list)
 
 
+def test_pdf_result_model_without_words_and_graphics():
+    pdf_result = PDFResult(
+        metadata={
+            "format": "PDF 1.7",
+            "file_path": "/path/to/sample.pdf",
+            "page_count": 1,
+            "page": 1
+        },
+        toc_items=[],
+        tables=[],
+        images=[],
+        text="Sample text"
+    )
+
+    assert pdf_result.graphics == []
+    assert pdf_result.words == []
+
+
 def test_formatted_result_model():
     formatted_result = FormattedResult(
         metadata=FormattedMetadata(
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.formatter.normalizer import normalize_markdown
+
+
+def test_normalize_reflows_paragraphs_and_joins_hyphenated_words():
+    text = "The committee re-\nviewed the  accounts\nof the   year.  \n\n\n\nA Well-\nKnown firm audited the pre-\n2020 figures."
+
+    assert normalize_markdown(text) == (
+        "The committee reviewed the accounts of the year.\n\n"
+        "A Well-Known firm audited the pre-2020 figures."
+    )
+
+
+def test_normalize_keeps_structure_lines():
+    text = (
+        "# Results  \n"
+        "Intro text\n"
+        "- first item that\n"
+        "  wraps\n"
+        "- second item\n"
+        "    - nested item\n"
+        "\n"
+        "| Item |  Amount |\n"
+        "|------|--------|\n"
+        "| Rent |  10 |\n"
+        "\n"
+        "> quoted line\n"
+        "> second quote\n"
+        "![](figure.png)\n"
+        "---\n"
+    )
+
+    assert normalize_markdown(text) == (
+        "# Results\n"
+        "Intro text\n"
+        "- first item that wraps\n"
+        "- second item\n"
+        "    - nested item\n"
+        "\n"
+        "| Item | Amount |\n"
+        "|------|--------|\n"
+        "| Rent | 10 |\n"
+        "\n"
+        "> quoted line\n"
+        "> second quote\n"
+        "![](figure.png)\n"
+        "---"
+    )
+
+
+def test_normalize_keeps_fenced_code():
+    code = "```python\ndef total(values):\n    return  sum(values)\n\n\n\nprint(total([1,  2]))\n```"
+    text = "Run the\nfollowing:\n\n" + code + "\nand check the out-\nput."
+
+    assert normalize_markdown(text) == "Run the following:\n\n" + code + "\nand check the output."
+
+
+def test_normalize_is_idempotent():
+    text = "Some hard-\nwrapped text\nwith   spaces.\n\n\n- item\n  more\n\n| a | b |\n|---|---|"
+
+    once = normalize_markdown(text)
+
+    assert normalize_markdown(once) == once
+
+
+def test_format_normalize_text_reduces_tokens(make_page):
+    text = "\n".join(["The committee reviewed the accounts of the year and ap-", "proved the budget.   "] * 20)
+
+    plain = FormatterMD([make_page(1, text)]).format()[0]
+    normalized = FormatterMD([make_page(1, text)], normalize_text=True).format()[0]
+    streamed = next(FormatterMD(iter([make_page(1, text)]), normalize_text=True).format_iter())
+
+    assert normalized.tokens < plain.tokens
+    assert "ap-\n" not in normalized.text and "approved" in normalized.text
+    assert streamed.text == normalized.text
+    assert streamed.tokens == normalized.tokens
+
+
+def test_format_normalizes_before_stitching(make_page):
+    pages = [make_page(1, "The board met in March\nand the"), make_page(2, "committee ap-\nproved it.\n\nMore.")]
+
+    results = FormatterMD(pages, stitch=True, normalize_text=True).format()
+
+    assert results[0].text == "The board met in March and the committee approved it."
+    stitched = results[0].stitched[0]
+    assert results[0].text[stitched.start:stitched.end] == "committee approved it."
+
+
+def test_normalize_scales_linearly():
+    page = "A hard-\nwrapped line of text\n" * 20 + "\n\n"
+    small, large = page * 200, page * 1600
+
+    start = time.perf_counter()
+    normalize_markdown(small)
+    small_time = time.perf_counter() - start
+    start = time.perf_counter()
+    normalize_markdown(large)
+    large_time = time.perf_counter() - start
+
+    assert large_time < small_time * 8 * 3
@@ -1,3 +1,4 @@
+import io
 import os
 import pytest
 import sys
@@ -197,4 +198,178 @@ def test_convert_with_images(sample_pdf_path, monkeypatch):
     assert result[0].images[0].number == 1
     assert result[0].images[0].width == 100
     assert result[0].images[0].height == 100
-    assert "data:image/png;base64," in result[0].text 
\ No newline at end of file
+    assert "data:image/png;base64," in result[0].text 
+
+
+def test_convert_iter_yields_one_page_at_a_time(sample_pdf_path, monkeypatch, make_page_chunk):
+    import pymupdf
+    with pymupdf.open(sample_pdf_path) as doc:
+        page_count = doc.page_count
+
+    requested_pages = []
+
+    def mock_to_markdown(doc, **kwargs):
+        assert kwargs.get('page_chunks') is True
+        assert kwargs.get('hdr_info') == "header-info"
+        requested_pages.append(kwargs['pages'])
+        page = kwargs['pages'][0]
+        return [make_page_chunk(sample_pdf_path, page + 1, doc.page_count, f"Page {page + 1}")]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", mock_to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: "header-info", raising=False)
+
+    pages = PDF2MarkDown(sample_pdf_path).convert_iter()
+
+    first = next(pages)
+    assert isinstance(first, PDFResult)
+    assert first.text == "Page 1"
+    assert requested_pages == [[0]]
+
+    rest = list(pages)
+    assert [item.metadata.page for item in [first] + rest] == list(range(1, page_count + 1))
+    assert requested_pages == [[i] for i in range(page_count)]
+
+
+def test_convert_iter_error(invalid_pdf_path):
+    pages = PDF2MarkDown(invalid_pdf_path).convert_iter()
+
+    with pytest.raises(ValueError) as excinfo:
+        next(pages)
+
+    assert "Error converting PDF to Markdown" in str(excinfo.value)
+
+
+def test_init_pdf2md_workers():
+    assert PDF2MarkDown("some/path/to/file.pdf").workers == 1
+    assert PDF2MarkDown("some/path/to/file.pdf", workers=4).workers == 4
+
+
+def test_page_shards_cover_all_pages_in_order():
+    pdf2md = PDF2MarkDown("some/path/to/file.pdf", workers=3)
+
+    shards = pdf2md._page_shards(50)
+
+    assert len(shards) == 12
+    assert [page for shard in shards for page in shard] == list(range(50))
+    assert max(len(shard) for shard in shards) - min(len(shard) for shard in shards) <= 1
+
+    assert pdf2md._page_shards(2) == [[0], [1]]
+
+
+def test_convert_parallel_merges_shards_in_page_order(sample_pdf_path, monkeypatch, make_page_chunk):
+    from concurrent.futures import ThreadPoolExecutor
+    import pymupdf
+
+    with pymupdf.open(sample_pdf_path) as doc:
+        page_count = doc.page_count
+
+    def mock_to_markdown(doc, **kwargs):
+        assert kwargs.get('hdr_info') == "header-info"
+        return [make_page_chunk(kwargs['filename'], page + 1, page_count, f"Page {page + 1}") for page in kwargs['pages']]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", mock_to_markdown)
+    monkeypatch.setattr("pymupdf4llm.IdentifyHeaders", lambda doc: "header-info", raising=False)
+    # alchemark_ai.pdf2md is shadowed by the pdf2md() function, so patch through sys.modules.
+    monkeypatch.setattr(sys.modules[PDF2MarkDown.__module__], "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    result = PDF2MarkDown(sample_pdf_path, workers=2).convert()
+
+    assert [item.metadata.page for item in result] == list(range(1, page_count + 1))
+    assert all(item.metadata.page_count == page_count for item in result)
+    assert [item.text for item in result] == [f"Page {page}" for page in range(1, page_count + 1)]
+
+
+def test_check_file_not_pdf_with_pdf_suffix(tmp_path):
+    file_path = tmp_path / "fake.pdf"
+    file_path.write_text("This is not a PDF file")
+
+    with pytest.raises(ValueError) as excinfo:
+        PDF2MarkDown(str(file_path))._check_file()
+
+    assert "not a PDF file" in str(excinfo.value)
+
+
+def test_check_file_pdf_without_suffix(tmp_path, sample_pdf_path):
+    file_path = tmp_path / "document.bin"
+    with open(sample_pdf_path, 'rb') as pdf_file:
+        file_path.write_bytes(pdf_file.read())
+
+    PDF2MarkDown(str(file_path))._check_file()
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO])
+def test_convert_in_memory_sources(sample_pdf_path, monkeypatch, wrap, make_page_chunk):
+    import pymupdf
+
+    with open(sample_pdf_path, 'rb') as pdf_file:
+        data = pdf_file.read()
+
+    def mock_to_markdown(doc, **kwargs):
+        assert isinstance(doc, pymupdf.Document)
+        assert kwargs.get('filename') == ""
+        return [make_page_chunk(kwargs['filename'], page + 1, doc.page_count) for page in range(doc.page_count)]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", mock_to_markdown)
+
+    result = PDF2MarkDown(wrap(data)).convert()
+
+    assert len(result) > 0
+    assert result[0].metadata.file_path == ""
+    assert result[-1].metadata.page == result[-1].metadata.page_count
+
+
+def test_convert_binary_file_object_keeps_name(sample_pdf_path, monkeypatch, make_page_chunk):
+    def mock_to_markdown(doc, **kwargs):
+        return [make_page_chunk(kwargs['filename'], 1, 1)]
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", mock_to_markdown)
+
+    with open(sample_pdf_path, 'rb') as pdf_file:
+        result = PDF2MarkDown(pdf_file).convert()
+
+    assert result[0].metadata.file_path == sample_pdf_path
+
+
+def test_check_file_in_memory_not_pdf():
+    with pytest.raises(ValueError) as excinfo:
+        PDF2MarkDown(b"This is not a PDF file")._check_file()
+
+    assert "not a PDF file" in str(excinfo.value)
+
+
+def test_check_file_text_file_object(non_pdf_file_path):
+    with open(non_pdf_file_path) as text_file:
+        with pytest.raises(ValueError) as excinfo:
+            PDF2MarkDown(text_file)._check_file()
+
+    assert "must be opened in binary mode" in str(excinfo.value)
+
+
+def test_convert_lean_drops_words_and_graphics(sample_pdf_path, monkeypatch, make_page_chunk):
+    chunk = make_page_chunk(sample_pdf_path, 1, 1)
+    chunk["words"] = [(0.0, 0.0, 10.0, 10.0, "Sample", 0, 0, 0)] * 100
+    chunk["graphics"] = [{"type": "f", "rect": (0, 0, 10, 10), "items": []}] * 100
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", lambda *args, **kwargs: [dict(chunk)])
+
+    full = PDF2MarkDown(sample_pdf_path).convert()
+    lean = PDF2MarkDown(sample_pdf_path, lean=True).convert()
+
+    assert len(full[0].words) == 100
+    assert len(full[0].graphics) == 100
+    assert lean[0].words == []
+    assert lean[0].graphics == []
+    assert lean[0].text == full[0].text
+    assert lean[0].metadata == full[0].metadata
+
+
+def test_convert_lean_skips_validating_payloads(sample_pdf_path, monkeypatch, make_page_chunk):
+    chunk = make_page_chunk(sample_pdf_path, 1, 1)
+    chunk["graphics"] = "not a list of dicts"
+
+    monkeypatch.setattr("pymupdf4llm.to_markdown", lambda *args, **kwargs: [dict(chunk)])
+
+    with pytest.raises(ValueError):
+        PDF2MarkDown(sample_pdf_path).convert()
+
+    assert PDF2MarkDown(sample_pdf_path, lean=True).convert()[0].graphics == []
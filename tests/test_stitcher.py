@@ -0,0 +1,94 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alchemark_ai.formatter.formatter_md import FormatterMD
+from alchemark_ai.formatter.stitcher import stitch_pages
+
+HEADER = "| Item | Amount |\n|------|--------|\n"
+IMAGE = "![](data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==)"
+
+
+def test_stitch_paragraph_continuation(make_page):
+    pages = list(stitch_pages([
+        make_page(1, "# Minutes\n\nThe board met in March and the committee\n"),
+        make_page(2, "approved the budget\nfor next year.\n\nOther business followed."),
+    ]))
+
+    assert pages[0].text == "# Minutes\n\nThe board met in March and the committee approved the budget for next year.\n"
+    assert pages[1].text == "Other business followed."
+    stitched = pages[0].stitched[0]
+    assert stitched.page == 2
+    assert pages[0].text[stitched.start:stitched.end] == "approved the budget for next year."
+
+
+def test_stitch_skips_complete_paragraphs_and_headings(make_page):
+    cases = [
+        ("The committee met.", "then it adjourned.\n\nMore text."),
+        ("The committee met and", "Then it adjourned.\n\nMore text."),
+        ("The committee met and", "## then a heading\n\nMore text."),
+        ("- a list item and", "then more.\n\nMore text."),
+        ("The committee met and", "then adjourned."),
+    ]
+    for first, second in cases:
+        pages = list(stitch_pages([make_page(1, first), make_page(2, second)]))
+
+        assert (pages[0].text, pages[1].text) == (first, second)
+        assert pages[0].stitched == []
+
+
+def test_stitch_table_with_repeated_header(make_page):
+    pages = list(stitch_pages([
+        make_page(1, "Budget\n\n" + HEADER + "| Rent | 10 |\n| Power | 5 |\n", tables=1),
+        make_page(2, HEADER + "| Travel | 7 |\n\nTotals follow.", tables=1),
+    ]))
+
+    assert pages[0].text == "Budget\n\n" + HEADER + "| Rent | 10 |\n| Power | 5 |\n| Travel | 7 |\n"
+    assert pages[1].text == "Totals follow."
+    assert pages[0].tables[0].rows == 4
+    assert pages[1].tables == []
+    assert pages[0].text[pages[0].stitched[0].start:pages[0].stitched[0].end] == "| Travel | 7 |"
+
+
+def test_stitch_keeps_tables_with_different_headers(make_page):
+    first = HEADER + "| Rent | 10 |"
+    second = "| Name | Role |\n|------|------|\n| Ann | Chair |\n\nMore."
+
+    pages = list(stitch_pages([make_page(1, first, tables=1), make_page(2, second, tables=1)]))
+
+    assert (pages[0].text, pages[1].text) == (first, second)
+
+
+def test_format_stitch_reports_spans_after_image_references(make_page):
+    pages = [
+        make_page(1, f"{IMAGE}\n\n" + HEADER + "| Rent | 10 |", tables=1),
+        make_page(2, HEADER + "| Travel | 7 |\n| Food | 3 |\n\nThe totals were approved by the"),
+        make_page(3, "board in April.\n\nEnd."),
+    ]
+
+    results = FormatterMD([page.model_copy(deep=True) for page in pages], stitch=True).format()
+    streamed = list(FormatterMD(iter([page.model_copy(deep=True) for page in pages]), stitch=True).format_iter())
+
+    assert results[0].elements.tables[0].content == HEADER + "| Rent | 10 |\n| Travel | 7 |\n| Food | 3 |\n"
+    assert results[0].text.startswith("[IMAGE](")
+    for result in results:
+        for stitched in result.stitched:
+            assert stitched.page == result.metadata.page + 1
+    assert [(result.text[stitched.start:stitched.end]) for result in results for stitched in result.stitched] == [
+        "| Travel | 7 |\n| Food | 3 |",
+        "board in April.",
+    ]
+    assert [result.text for result in streamed] == [result.text for result in results]
+
+
+def test_format_chunks_list_stitched_pages(make_page):
+    pages = [
+        make_page(1, "The board met in March and the committee"),
+        make_page(2, "approved the budget.\n\nOther business followed."),
+    ]
+
+    chunks = FormatterMD(pages, stitch=True).format_chunks(max_tokens=100, overlap=0)
+
+    assert chunks[0].pages == [1, 2]
+    assert [span.page for span in chunks[0].spans] == [1, 2]